@@ -118,6 +118,7 @@ class ConfigManager:
             "twitch_client_id": "",
             "twitch_oauth_token": "",
             "twitch_username": "",
+            "twitch_user_id_cache": {},  # 频道名(小写) -> Twitch 用户ID，避免重复查询 /helix/users
             "twitch_download_folder": "./data/twitch",
             "replay_download_folder": "./data/twitch",
             "CHECKPOINT_INTERVAL": 10,
@@ -128,6 +129,9 @@ class ConfigManager:
             "MIN_CLIP_DURATION": 45.0,
             "MAX_CLIP_DURATION": 180.0,
             "CLIP_CONTEXT_EXTEND": 15.0,
+            # 切片时 MP4 输入的 ffmpeg 探测参数（analyzeduration 单位：微秒）
+            "FFMPEG_PROBE_SIZE": "1M",
+            "FFMPEG_ANALYZE_DURATION": "100000",
             "MERGE_NEARBY_CLIPS": True,
             "CLIP_MERGE_THRESHOLD": 10.0,
             "ENABLE_SEMANTIC_MERGE": True,
@@ -140,6 +144,8 @@ class ConfigManager:
             "SEMANTIC_TARGET_DURATION": 90.0,
             "SEMANTIC_DURATION_WEIGHT": 0.08,
             "SEMANTIC_SCORE_WARN": 1000.0,
+            # 语义合并 TF-IDF 词表缓存（留空=每个视频重新拟合）
+            "TFIDF_CACHE_PATH": "",
             "OPENAI_API_KEY": "",
             "OPENAI_BASE_URL": "",
             "OPENAI_MODEL": "",
@@ -196,6 +202,7 @@ class ConfigManager:
             # Twitch 页面缩略图并发与开关
             "DISABLE_TWITCH_THUMBNAILS": False,
             "TWITCH_THUMBNAIL_CONCURRENCY": 6,
+            "TWITCH_CHAT_SPEED_MODE": False,  # 聊天记录下载不嵌入表情图片（显著更快，HTML 中不显示表情）
             "HUGGINGFACE_TOKEN": "",  # 新增：可通过设置界面直接写入
             "SUMMARY_BACKEND": "local",
             "LOCAL_SUMMARY_MODEL": "google/gemma-3-4b-it",
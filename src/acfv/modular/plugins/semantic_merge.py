@@ -15,6 +15,11 @@ logger = logging.getLogger(__name__)
 SCHEMA_VERSION = "1.0.0"
 UNITS = "ms"
 SORT_POLICY = "start_ms_asc_end_ms_asc"
+TFIDF_MAX_FEATURES = 5000
+# Bump when the vectorizer settings change so stale TFIDF_CACHE_PATH sidecars are refit.
+TFIDF_CACHE_SCHEMA = 1
+
+_tfidf_cache: Dict[str, Any] = {}
 
 
 def _write_json(path: Path, data: Any) -> None:
@@ -47,6 +52,60 @@ def _get_config_bool(name: str, fallback: bool) -> bool:
         return bool(fallback)
 
 
+def _get_config_str(name: str, fallback: str) -> str:
+    cm = getattr(app_config, "config_manager", None)
+    try:
+        if cm is None:
+            return fallback
+        value = cm.get(name, fallback)
+        return str(value) if value is not None else fallback
+    except Exception:
+        return fallback
+
+
+def _tfidf_transform(texts: List[str]):
+    """Fit TF-IDF on ``texts``, or reuse the vocabulary cached at ``TFIDF_CACHE_PATH``.
+
+    With a cache path configured the vectorizer is fitted once, persisted with joblib and
+    afterwards only ``transform`` runs, which skips the per-video vocabulary scan.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    cache_path = _get_config_str("TFIDF_CACHE_PATH", "").strip()
+    if not cache_path:
+        return TfidfVectorizer(max_features=TFIDF_MAX_FEATURES).fit_transform(texts)
+
+    path = Path(cache_path).expanduser()
+    key = str(path)
+    vectorizer = _tfidf_cache.get(key)
+    if vectorizer is None and path.exists():
+        try:
+            import joblib
+
+            payload = joblib.load(path)
+            if isinstance(payload, dict) and payload.get("schema") == TFIDF_CACHE_SCHEMA:
+                vectorizer = payload.get("vectorizer")
+        except Exception as exc:
+            logger.warning("[semantic_merge] ignore unreadable TF-IDF cache %s: %s", path, exc)
+            vectorizer = None
+    if vectorizer is not None:
+        _tfidf_cache[key] = vectorizer
+        return vectorizer.transform(texts)
+
+    vectorizer = TfidfVectorizer(max_features=TFIDF_MAX_FEATURES)
+    mat = vectorizer.fit_transform(texts)
+    _tfidf_cache[key] = vectorizer
+    try:
+        import joblib
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump({"schema": TFIDF_CACHE_SCHEMA, "vectorizer": vectorizer}, path)
+        logger.info("[semantic_merge] saved TF-IDF vocabulary cache to %s", path)
+    except Exception as exc:
+        logger.warning("[semantic_merge] failed to save TF-IDF cache %s: %s", path, exc)
+    return mat
+
+
 def _count_meaningful_chars(text: str) -> int:
     if not text:
         return 0
@@ -108,42 +167,110 @@ def _normalize_analysis_segments(payload: Any) -> List[Dict[str, Any]]:
     return normalized
 
 
-def _build_similarity_fn(texts: List[str]):
-    try:
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.metrics.pairwise import cosine_similarity
-
-        vectorizer = TfidfVectorizer(max_features=5000)
-        mat = vectorizer.fit_transform(texts) if texts else None
-
-        def cosine(i: int, j: int) -> float:
-            if mat is None:
-                return 1.0
-            return float(cosine_similarity(mat[i], mat[j])[0][0])
+class _BlockSimilarity:
+    """Cosine similarity between a transcript segment and the running centroid of the current block.
 
-        return cosine
-    except Exception:
-        import math
-        import re
-        from collections import Counter
-
-        def to_bow(t: str) -> Counter:
-            tokens = re.findall(r"\w+", (t or "").lower())
-            return Counter(tokens)
-
-        bows = [to_bow(text) for text in texts]
+    The centroid is kept as the sum of L2-normalized segment vectors together with its squared
+    norm, so joining a segment and scoring the next one only touch that segment's non-zero terms.
+    """
 
-        def cosine(i: int, j: int) -> float:
-            a, b = bows[i], bows[j]
-            if not a or not b:
-                return 0.0
-            keys = set(a) | set(b)
-            dot = sum(a.get(k, 0) * b.get(k, 0) for k in keys)
-            na = math.sqrt(sum(v * v for v in a.values()))
-            nb = math.sqrt(sum(v * v for v in b.values()))
-            return (dot / (na * nb)) if na > 0 and nb > 0 else 0.0
+    def __init__(self, texts: List[str]) -> None:
+        self._mat = None
+        self._bows: Optional[List[Dict[str, float]]] = None
+        try:
+            import numpy as np
 
-        return cosine
+            self._mat = _tfidf_transform(texts).tocsr() if texts else None
+            self._centroid: Any = np.zeros(self._mat.shape[1]) if self._mat is not None else None
+        except Exception:
+            import math
+            from collections import Counter
+
+            self._mat = None
+            self._bows = []
+            for text in texts:
+                counts = Counter(re.findall(r"\w+", (text or "").lower()))
+                norm = math.sqrt(sum(v * v for v in counts.values()))
+                self._bows.append({k: v / norm for k, v in counts.items()} if norm > 0 else {})
+            self._centroid = {}
+        self._norm_sq = 0.0
+
+    def _row(self, idx: int):
+        if self._mat is not None:
+            row = self._mat[idx]
+            return row.indices, row.data
+        bow = self._bows[idx] if self._bows is not None else {}
+        return list(bow.keys()), list(bow.values())
+
+    def _dot(self, keys, values) -> float:
+        if self._mat is not None:
+            return float(values @ self._centroid[keys])
+        centroid = self._centroid
+        return sum(v * centroid.get(k, 0.0) for k, v in zip(keys, values))
+
+    def reset(self, idx: int) -> None:
+        """Start a new block containing only segment ``idx``."""
+        if self._mat is not None:
+            self._centroid[:] = 0.0
+        elif self._centroid is not None:
+            self._centroid = {}
+        self._norm_sq = 0.0
+        self.add(idx)
+
+    def add(self, idx: int) -> None:
+        """Fold segment ``idx`` into the current block centroid."""
+        if self._centroid is None:
+            return
+        keys, values = self._row(idx)
+        if len(keys) == 0:
+            return
+        dot = self._dot(keys, values)
+        self._norm_sq += 2.0 * dot + sum(v * v for v in values)
+        if self._mat is not None:
+            self._centroid[keys] += values
+        else:
+            for k, v in zip(keys, values):
+                self._centroid[k] = self._centroid.get(k, 0.0) + v
+
+    def similarity(self, idx: int) -> float:
+        """Cosine similarity of segment ``idx`` against the current block centroid."""
+        if self._centroid is None:
+            return 1.0
+        keys, values = self._row(idx)
+        if len(keys) == 0 or self._norm_sq <= 0.0:
+            return 0.0
+        # Rows are L2-normalized, so only the centroid norm is needed.
+        return self._dot(keys, values) / (self._norm_sq ** 0.5)
+
+    def is_similar(self, idx: int, threshold: float) -> bool:
+        """Whether ``similarity(idx) >= threshold``.
+
+        The bag-of-words fallback stops scanning tokens as soon as the partial dot product
+        proves the threshold is met, or the Cauchy-Schwarz bound of the unscanned tail shows
+        it can no longer be reached (all weights are non-negative).
+        """
+        if self._centroid is None:
+            return True
+        if self._mat is not None:
+            return self.similarity(idx) >= threshold
+        keys, values = self._row(idx)
+        if len(keys) == 0 or self._norm_sq <= 0.0:
+            return 0.0 >= threshold
+        centroid = self._centroid
+        norm_c = self._norm_sq ** 0.5
+        thresh_dot = threshold * norm_c
+        dot = 0.0
+        remaining_sq = 1.0
+        for k, v in zip(keys, values):
+            c = centroid.get(k)
+            if c is not None:
+                dot += v * c
+                if dot >= thresh_dot:
+                    return True
+            remaining_sq -= v * v
+            if dot + (max(remaining_sq, 0.0) ** 0.5) * norm_c < thresh_dot:
+                return False
+        return dot >= thresh_dot
 
 
 def _score_from_analysis(
@@ -340,24 +467,24 @@ def run(ctx: ModuleContext) -> Dict[str, Any]:
     trim_cluster_gap_sec = max(1.0, min(8.0, max_gap))
 
     texts = [seg["text"] for seg in transcript_segments]
-    cosine = _build_similarity_fn(texts)
+    block_sim = _BlockSimilarity(texts)
 
     semantic_segments: List[Dict[str, Any]] = []
     cur_start = None
     cur_end = None
-    cur_last_idx = None
     cur_texts: List[str] = []
 
     for idx, seg in enumerate(transcript_segments):
         s = seg["start"]
         e = seg["end"]
         if cur_start is None:
-            cur_start, cur_end, cur_last_idx, cur_texts = s, e, idx, [seg["text"]]
+            cur_start, cur_end, cur_texts = s, e, [seg["text"]]
+            block_sim.reset(idx)
             continue
 
         gap = s - cur_end
         try:
-            similar = cosine(cur_last_idx, idx) >= sim_threshold if cur_last_idx is not None else True
+            similar = block_sim.is_similar(idx, sim_threshold)
         except Exception:
             similar = True
 
@@ -365,17 +492,18 @@ def run(ctx: ModuleContext) -> Dict[str, Any]:
         current_len = cur_end - cur_start
         if current_len < min_sec:
             cur_end = max(cur_end, e)
-            cur_last_idx = idx
+            block_sim.add(idx)
             cur_texts.append(seg["text"])
             continue
 
         allow_break_len = min_sec + max(0.0, stickiness_sec)
         if (gap > max_gap) or (new_dur >= max_sec) or ((current_len >= allow_break_len) and (not similar) and (current_len >= target_sec * 0.8)):
             semantic_segments.append({"start": cur_start, "end": cur_end, "text": " ".join(cur_texts)})
-            cur_start, cur_end, cur_last_idx, cur_texts = s, e, idx, [seg["text"]]
+            cur_start, cur_end, cur_texts = s, e, [seg["text"]]
+            block_sim.reset(idx)
         else:
             cur_end = max(cur_end, e)
-            cur_last_idx = idx
+            block_sim.add(idx)
             cur_texts.append(seg["text"])
 
     if cur_start is not None:
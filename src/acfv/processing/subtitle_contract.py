@@ -8,6 +8,8 @@ from typing import Any, Dict, List
 
 SCHEMA_VERSION = "1.0.0"
 ALLOWED_FORMATS = {"srt", "ass"}
+# ASS uses "\N" as a hard line break; stray carriage returns are dropped.
+_ASS_NEWLINE_TABLE = str.maketrans({"\n": "\\N", "\r": ""})
 
 
 @dataclass
@@ -62,18 +64,16 @@ def _validate_payload(payload: Dict[str, Any]) -> SubtitleOptions:
     )
 
 
-def _format_srt_time(seconds: float) -> str:
-    seconds = max(0.0, seconds)
-    total_ms = int(round(seconds * 1000))
+def _format_srt_time(total_ms: int) -> str:
+    """Format a non-negative integer millisecond count as ``HH:MM:SS,mmm``."""
     hours, remainder = divmod(total_ms, 3600_000)
     minutes, remainder = divmod(remainder, 60_000)
     secs, millis = divmod(remainder, 1000)
     return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
 
 
-def _format_ass_time(seconds: float) -> str:
-    seconds = max(0.0, seconds)
-    total_cs = int(round(seconds * 100))
+def _format_ass_time(total_cs: int) -> str:
+    """Format a non-negative integer centisecond count as ``H:MM:SS.cc``."""
     hours, remainder = divmod(total_cs, 360_000)
     minutes, remainder = divmod(remainder, 6000)
     secs, centis = divmod(remainder, 100)
@@ -81,15 +81,14 @@ def _format_ass_time(seconds: float) -> str:
 
 
 def _write_srt(segments: List[Dict[str, Any]], path: Path, offset: float) -> None:
-    lines: List[str] = []
-    for idx, seg in enumerate(segments, 1):
-        start = _format_srt_time(seg["start"] + offset)
-        end = _format_srt_time(seg["end"] + offset)
-        lines.append(str(idx))
-        lines.append(f"{start} --> {end}")
-        lines.append(seg["text"])
-        lines.append("")
-    path.write_text("\n".join(lines), encoding="utf-8")
+    with path.open("w", encoding="utf-8") as f:
+        w = f.write
+        for idx, seg in enumerate(segments, 1):
+            start = _format_srt_time(max(0, int(round((seg["start"] + offset) * 1000))))
+            end = _format_srt_time(max(0, int(round((seg["end"] + offset) * 1000))))
+            if idx > 1:
+                w("\n")
+            w(f"{idx}\n{start} --> {end}\n{seg['text']}\n")
 
 
 def _write_ass(segments: List[Dict[str, Any]], path: Path, offset: float) -> None:
@@ -108,13 +107,14 @@ def _write_ass(segments: List[Dict[str, Any]], path: Path, offset: float) -> Non
         "[Events]",
         "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
     ]
-    body: List[str] = []
-    for seg in segments:
-        start = _format_ass_time(seg["start"] + offset)
-        end = _format_ass_time(seg["end"] + offset)
-        text = (seg["text"] or "").replace("\n", "\\N")
-        body.append(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}")
-    path.write_text("\n".join(header + body), encoding="utf-8")
+    with path.open("w", encoding="utf-8") as f:
+        w = f.write
+        w("\n".join(header))
+        for seg in segments:
+            start = _format_ass_time(max(0, int(round((seg["start"] + offset) * 100))))
+            end = _format_ass_time(max(0, int(round((seg["end"] + offset) * 100))))
+            text = (seg["text"] or "").translate(_ASS_NEWLINE_TABLE)
+            w(f"\nDialogue: 0,{start},{end},Default,,0,0,0,,{text}")
 
 
 def generate_subtitle(payload: Dict[str, Any]) -> Dict[str, Any]:
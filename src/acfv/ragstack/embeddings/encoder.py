@@ -6,6 +6,10 @@ from typing import Callable, Iterable, List
 
 import numpy as np
 
+# Identifies the vectors produced by the hash fallback. Bump it whenever
+# _hash_embed changes so indexes built with an older fallback are rejected.
+HASH_EMBED_SCHEME = "hash-shake128-v1"
+
 
 @lru_cache(maxsize=2)
 def _load_sentence_transformer(model_name: str):
@@ -20,28 +24,45 @@ def _load_sentence_transformer(model_name: str):
 
 
 def load_encoder(model_name: str = "all-MiniLM-L6-v2") -> Callable[[Iterable[str]], np.ndarray]:
-    st_model = _load_sentence_transformer(model_name)
-    if st_model is not None:
-        def encode(texts: Iterable[str]) -> np.ndarray:
-            # sentence_transformers returns list; convert to float32 np array.
-            return np.asarray(st_model.encode(list(texts), convert_to_numpy=True), dtype=np.float32)
-        return encode
-
-    def _hash_embed(text: str, dim: int = 384) -> np.ndarray:
-        # Lightweight deterministic fallback: hash text into a pseudo-embedding.
-        digest = hashlib.sha256(text.encode("utf-8")).digest()
-        seed = int.from_bytes(digest[:8], "little", signed=False)
-        rng = np.random.default_rng(seed)
-        vec = rng.standard_normal(dim)
-        norm = np.linalg.norm(vec) + 1e-8
-        return (vec / norm).astype(np.float32)
+    """Return an encoder producing float32, L2-normalized embeddings (one row per text)."""
+    # The sentence-transformers import and model load are deferred to the first
+    # encode call, so callers that never encode text do not pay for them.
+    def _hash_embed(texts: List[str], dim: int = 384) -> np.ndarray:
+        # Lightweight deterministic fallback: expand each text's SHAKE-128 digest
+        # into a pseudo-embedding, then scale and normalize all rows at once.
+        raw = b"".join(hashlib.shake_128(t.encode("utf-8")).digest(dim * 4) for t in texts)
+        vecs = np.frombuffer(raw, dtype="<u4").reshape(-1, dim).astype(np.float32)
+        vecs *= np.float32(1.0 / 2**32)
+        vecs -= np.float32(0.5)
+        vecs /= np.linalg.norm(vecs, axis=1, keepdims=True) + np.float32(1e-8)
+        return vecs
 
     def encode(texts: Iterable[str]) -> np.ndarray:
-        return np.stack([_hash_embed(t) for t in texts], axis=0)
+        texts = list(texts)
+        st_model = _load_sentence_transformer(model_name)
+        if st_model is not None:
+            # L2-normalize inside the model call; ST already returns float32, so
+            # astype(copy=False) is a no-op in the common case.
+            arr = st_model.encode(
+                texts,
+                batch_size=64,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+            return np.asarray(arr).astype(np.float32, copy=False)
+        return _hash_embed(texts)
 
     return encode
 
 
+def embedding_scheme(model_name: str = "all-MiniLM-L6-v2") -> str:
+    """Name the embedding scheme ``load_encoder(model_name)`` produces (stored with the index)."""
+    if _load_sentence_transformer(model_name) is not None:
+        return f"sentence-transformers:{model_name}"
+    return HASH_EMBED_SCHEME
+
+
 def encode(texts: Iterable[str], model_name: str = "all-MiniLM-L6-v2") -> np.ndarray:
     """Public helper to encode without manually loading the encoder."""
     return load_encoder(model_name)(texts)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List, Tuple
 
@@ -12,10 +14,42 @@ try:
 except Exception:
     faiss = None  # type: ignore
 
+# Below this many vectors an exact flat scan is fast enough and has perfect recall.
+HNSW_MIN_VECTORS = 10_000
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH_MIN = 64
+# Collections at least this large store 8-bit scalar-quantized vectors (4x smaller).
+QUANTIZE_MIN_VECTORS = 10_000
+
 
 def _normalize(vectors: np.ndarray) -> np.ndarray:
-    norms = np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-8
-    return vectors / norms
+    # Row norms via a single fused multiply-sum; only the output is allocated
+    # (the caller's array may be aliased by np.asarray, so it is not modified).
+    inv_norms = np.einsum("ij,ij->i", vectors, vectors)
+    np.sqrt(inv_norms, out=inv_norms)
+    inv_norms += 1e-8
+    np.reciprocal(inv_norms, out=inv_norms)
+    return vectors * inv_norms[:, None]
+
+
+def _scheme_path(id_map_path: Path) -> Path:
+    return id_map_path.with_suffix(".meta.json")
+
+
+def read_embedding_scheme(id_map_path: Path) -> str | None:
+    """Embedding scheme recorded by ``build_index``; None for indexes without metadata."""
+    try:
+        meta = json.loads(_scheme_path(id_map_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return meta.get("embedding_scheme") if isinstance(meta, dict) else None
+
+
+@lru_cache(maxsize=4)
+def _read_index_cached(path_str: str, mtime_ns: int):
+    # Keyed on mtime so a rebuilt index file is picked up on the next search.
+    return faiss.read_index(path_str)
 
 
 def build_index(
@@ -24,8 +58,24 @@ def build_index(
     index_path: Path,
     id_map_path: Path,
     emb_cache_path: Path | None = None,
+    exact: bool | None = None,
+    quantize: bool = True,
+    normalized: bool = False,
+    embedding_scheme: str | None = None,
 ) -> None:
-    embeddings = _normalize(np.asarray(embeddings, dtype=np.float32))
+    """Persist a cosine-similarity index over ``embeddings``.
+
+    ``exact`` selects a flat inner-product index; by default it is used only for
+    collections smaller than ``HNSW_MIN_VECTORS``, larger ones get an HNSW graph.
+    With ``quantize``, collections of ``QUANTIZE_MIN_VECTORS`` or more store
+    8-bit scalar-quantized vectors instead of float32. Pass ``normalized=True``
+    when the rows are already unit length (e.g. from ``load_encoder``).
+    ``embedding_scheme`` (see ``encoder.embedding_scheme``) is recorded next to
+    the id map so ``search`` can reject queries encoded differently.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if not normalized:
+        embeddings = _normalize(embeddings)
     id_array = np.asarray(list(clip_ids), dtype=np.int64)
     index_path.parent.mkdir(parents=True, exist_ok=True)
     id_map_path.parent.mkdir(parents=True, exist_ok=True)
@@ -33,7 +83,24 @@ def build_index(
         emb_cache_path.parent.mkdir(parents=True, exist_ok=True)
 
     if FAISS_AVAILABLE:
-        index = faiss.IndexFlatIP(embeddings.shape[1])
+        dim = embeddings.shape[1]
+        if exact is None:
+            exact = embeddings.shape[0] < HNSW_MIN_VECTORS
+        quantize = quantize and embeddings.shape[0] >= QUANTIZE_MIN_VECTORS
+        qt_8bit = faiss.ScalarQuantizer.QT_8bit
+        if exact:
+            if quantize:
+                index = faiss.IndexScalarQuantizer(dim, qt_8bit, faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexFlatIP(dim)
+        else:
+            if quantize:
+                index = faiss.IndexHNSWSQ(dim, qt_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        if not index.is_trained:
+            index.train(embeddings)
         index.add(embeddings)
         faiss.write_index(index, str(index_path))
     else:
@@ -43,13 +110,26 @@ def build_index(
     np.save(id_map_path, id_array)
     if emb_cache_path:
         np.save(emb_cache_path, embeddings)
+    scheme_path = _scheme_path(id_map_path)
+    if embedding_scheme is not None:
+        scheme_path.write_text(json.dumps({"embedding_scheme": embedding_scheme}), encoding="utf-8")
+    else:
+        scheme_path.unlink(missing_ok=True)
+
+
+@lru_cache(maxsize=4)
+def _load_npy_cached(path_str: str, mtime_ns: int) -> np.ndarray:
+    arr = np.load(path_str)
+    arr.setflags(write=False)  # shared between searches
+    return arr
 
 
 def _load_embeddings(index_path: Path, emb_cache_path: Path | None = None) -> np.ndarray:
     if emb_cache_path and emb_cache_path.exists():
-        return np.load(emb_cache_path)
-    npy_path = index_path if index_path.suffix == ".npy" else index_path.with_suffix(".npy")
-    return np.load(npy_path)
+        path = emb_cache_path
+    else:
+        path = index_path if index_path.suffix == ".npy" else index_path.with_suffix(".npy")
+    return _load_npy_cached(str(path), path.stat().st_mtime_ns)
 
 
 def search(
@@ -58,27 +138,45 @@ def search(
     index_path: Path,
     id_map_path: Path,
     emb_cache_path: Path | None = None,
+    normalized: bool = False,
+    embedding_scheme: str | None = None,
 ) -> Tuple[List[int], List[float]]:
-    query_emb = _normalize(np.asarray(query_emb, dtype=np.float32))
-    id_array = np.load(id_map_path)
+    if embedding_scheme is not None:
+        stored = read_embedding_scheme(id_map_path)
+        if stored != embedding_scheme:
+            # Vectors from different schemes are not comparable; searching would
+            # return plausible-looking but wrong neighbours.
+            raise ValueError(
+                f"Index {index_path} was built with embedding scheme {stored or 'unknown'}, "
+                f"but queries use {embedding_scheme}; rebuild it with acfv.scripts.rebuild_index."
+            )
+    query_emb = np.asarray(query_emb, dtype=np.float32)
+    if not normalized:
+        query_emb = _normalize(query_emb)
+    id_array = _load_npy_cached(str(id_map_path), id_map_path.stat().st_mtime_ns)
 
     if FAISS_AVAILABLE and index_path.exists():
-        index = faiss.read_index(str(index_path))
+        index = _read_index_cached(str(index_path), index_path.stat().st_mtime_ns)
+        if hasattr(index, "hnsw"):
+            index.hnsw.efSearch = max(HNSW_EF_SEARCH_MIN, top_k * 4)
         scores, idxs = index.search(query_emb, top_k)
     else:
         embeddings = _load_embeddings(index_path, emb_cache_path)
         scores = query_emb @ embeddings.T
-        idxs = np.argpartition(-scores, kth=min(top_k, scores.shape[1] - 1), axis=1)[:, :top_k]
-        # Re-sort each row by score descending for stability.
-        for row in range(idxs.shape[0]):
-            order = np.argsort(-scores[row, idxs[row]])
-            idxs[row] = idxs[row, order]
-            scores[row] = scores[row, idxs[row]]
+        k = min(top_k, scores.shape[1])
+        if k <= 0:
+            return [], []
+        idxs = np.argpartition(-scores, kth=k - 1, axis=1)[:, :k]
+        # Re-sort each row's top-k by score descending.
+        top_scores = np.take_along_axis(scores, idxs, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        idxs = np.take_along_axis(idxs, order, axis=1)
+        scores = np.take_along_axis(top_scores, order, axis=1)
 
     clip_ids: List[int] = []
     clip_scores: List[float] = []
     for i, score in zip(idxs[0], scores[0]):
-        if i < len(id_array):
+        if 0 <= i < len(id_array):
             clip_ids.append(int(id_array[i]))
             clip_scores.append(float(score))
     return clip_ids, clip_scores
@@ -9,7 +9,7 @@ from .. import (
     DEFAULT_FAISS_INDEX_PATH,
     DEFAULT_ID_MAP_PATH,
 )
-from ..embeddings.encoder import load_encoder
+from ..embeddings.encoder import embedding_scheme, load_encoder
 from ..index.faiss_index import search
 from ..preference.engine import rerank_clips_for_user
 from ..storage import db as storage_db
@@ -27,8 +27,18 @@ def vector_search(
     index_path: Path = DEFAULT_FAISS_INDEX_PATH,
     id_map_path: Path = DEFAULT_ID_MAP_PATH,
     emb_cache_path: Path | None = DEFAULT_EMB_CACHE_PATH,
+    normalized: bool = False,
+    embedding_scheme: str | None = None,
 ) -> Tuple[List[int], List[float]]:
-    return search(query_emb, top_k, index_path, id_map_path, emb_cache_path=emb_cache_path)
+    return search(
+        query_emb,
+        top_k,
+        index_path,
+        id_map_path,
+        emb_cache_path=emb_cache_path,
+        normalized=normalized,
+        embedding_scheme=embedding_scheme,
+    )
 
 
 def fetch_clips(
@@ -50,7 +60,13 @@ def rag_retrieve(
 ) -> Tuple[List[Clip], List[float]]:
     query_emb = embed_query(query_text, model_name=model_name)
     clip_ids, scores = vector_search(
-        query_emb, top_k=top_k, index_path=index_path, id_map_path=id_map_path, emb_cache_path=emb_cache_path
+        query_emb,
+        top_k=top_k,
+        index_path=index_path,
+        id_map_path=id_map_path,
+        emb_cache_path=emb_cache_path,
+        normalized=True,
+        embedding_scheme=embedding_scheme(model_name),
     )
     clips = fetch_clips(clip_ids, db_path=db_path)
     # Align scores with fetched clips order
@@ -13,7 +13,7 @@ from acfv.ragstack import (
     DEFAULT_FAISS_INDEX_PATH,
     DEFAULT_ID_MAP_PATH,
 )
-from acfv.ragstack.embeddings.encoder import load_encoder
+from acfv.ragstack.embeddings.encoder import embedding_scheme, load_encoder
 from acfv.ragstack.index.faiss_index import build_index
 from acfv.ragstack.storage import db as storage_db
 from acfv.ragstack.storage.models import Clip
@@ -65,6 +65,8 @@ def ingest(jsonl_path: Path, db_path: Path, index_path: Path, id_map_path: Path,
         index_path=index_path,
         id_map_path=id_map_path,
         emb_cache_path=emb_cache_path,
+        normalized=True,
+        embedding_scheme=embedding_scheme(model_name),
     )
     print(f"Ingested {len(clip_ids)} clips into {db_path}")
 
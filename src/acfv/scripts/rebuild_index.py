@@ -12,7 +12,7 @@ from acfv.ragstack import (
     DEFAULT_FAISS_INDEX_PATH,
     DEFAULT_ID_MAP_PATH,
 )
-from acfv.ragstack.embeddings.encoder import load_encoder
+from acfv.ragstack.embeddings.encoder import embedding_scheme, load_encoder
 from acfv.ragstack.index.faiss_index import build_index
 from acfv.ragstack.storage import db as storage_db
 
@@ -33,6 +33,8 @@ def rebuild(db_path: Path, index_path: Path, id_map_path: Path, emb_cache_path:
         index_path=index_path,
         id_map_path=id_map_path,
         emb_cache_path=emb_cache_path,
+        normalized=True,
+        embedding_scheme=embedding_scheme(model_name),
     )
     print(f"Rebuilt index with {len(clip_ids)} clips")
 
@@ -4,20 +4,8 @@ from pathlib import Path
 from acfv.main_logging import log_info, log_error, log_debug, log_warning
 import datetime
 import json
-import cv2
 from acfv import config
 
-# 语义分析相关导入
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-    import numpy as np
-    SEMANTIC_AVAILABLE = True
-    log_info("[clip_video] 语义分析模块加载成功")
-except ImportError as e:
-    SEMANTIC_AVAILABLE = False
-    log_error(f"[clip_video] 语义分析模块导入失败: {e}")
-
 # 全局变量用于缓存TF-IDF向量器
 _tfidf_vectorizer = None
 
@@ -162,6 +150,7 @@ def generate_clips_from_segments(video_path, segments, output_dir, progress_call
 def get_video_duration(video_path):
     """获取视频时长"""
     try:
+        import cv2
         cap = cv2.VideoCapture(video_path)
         fps = cap.get(cv2.CAP_PROP_FPS)
         frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
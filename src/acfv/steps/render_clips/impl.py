@@ -4,6 +4,7 @@ from pathlib import Path
 from acfv.main_logging import log_info, log_error, log_debug, log_warning
 import datetime
 import json
+from operator import itemgetter
 from acfv import config
 from typing import List, Dict, Any
 
@@ -12,6 +13,12 @@ MIN_CLIP_DURATION_SEC = 45.0
 PREF_CLIP_DURATION_SEC = 90.0
 MAX_CLIP_DURATION_SEC = 150.0
 NAMING_POLICY = "clip_{rank:03d}_{HHhMMmSSs}_{start_ms}-{end_ms}.mp4"
+# 流拷贝输出超过该体积且 ffmpeg 无错误输出时跳过 ffprobe 校验
+FAST_COPY_TRUSTED_BYTES = 64 * 1024
+# MP4 类输入的 ffmpeg 探测参数（可通过 FFMPEG_PROBE_SIZE / FFMPEG_ANALYZE_DURATION 覆盖）
+FFMPEG_PROBE_SIZE = "1M"
+FFMPEG_ANALYZE_DURATION = "100000"
+FAST_PROBE_SUFFIXES = (".mp4", ".m4v", ".mov")
 
 
 def _normalize_segments_data(data: Any) -> List[Dict[str, Any]]:
@@ -61,10 +68,10 @@ def _normalize_segments_data(data: Any) -> List[Dict[str, Any]]:
             }
         )
 
+    # 字段已统一为 float，用 itemgetter 在 C 层取键；利用稳定排序实现 score 降序 + 时间升序
+    segments.sort(key=itemgetter("start", "end"))
     if sort_policy == "score_desc_start_ms_asc_end_ms_asc":
-        segments.sort(key=lambda s: (-s.get("score", 0.0), s["start"], s["end"]))
-    else:
-        segments.sort(key=lambda s: (s["start"], s["end"]))
+        segments.sort(key=itemgetter("score"), reverse=True)
 
     # 详细输出每个片段的兴趣分数与区间，便于终端排障
     if segments:
@@ -78,6 +85,37 @@ def _normalize_segments_data(data: Any) -> List[Dict[str, Any]]:
             )
     return segments
 
+def _iter_valid_segments(segments, min_seg_seconds):
+    """逐个产出有效片段（start<end、score>0、时长达标），跳过的片段记 warning 日志。"""
+    kept = 0
+    for i, seg in enumerate(segments):
+        start = seg.get('start', 0)
+        end = seg.get('end', 0)
+        score = seg.get('score', 0)
+
+        if start >= end:
+            log_warning(f"[clip_video] 跳过无效片段 {i+1}: start({start}) >= end({end})")
+            continue
+
+        if score <= 0:
+            log_warning(f"[clip_video] 跳过低分片段 {i+1}: score={score}")
+            continue
+
+        if end - start < min_seg_seconds:
+            log_warning(
+                f"[clip_video] 跳过过短片段 {i+1}: 持续时间={end-start:.1f}s (<{min_seg_seconds:.1f}s)"
+            )
+            continue
+
+        kept += 1
+        label = ""
+        if seg.get("reason_tags"):
+            label = f" tags={','.join(seg.get('reason_tags'))}"
+        elif seg.get("text"):
+            label = f" text={seg.get('text')[:30]}"
+        log_info(f"[clip_video] 有效片段 {kept}: {start:.1f}s-{end:.1f}s, 评分={score:.3f}{label}")
+        yield seg
+
 def _get_min_clip_segment_seconds() -> float:
     cm = getattr(config, "config_manager", None)
     try:
@@ -93,30 +131,87 @@ def _get_min_clip_segment_seconds() -> float:
         return float(MIN_CLIP_SEGMENT_SECONDS)
 from typing import List, Dict, Any
 
-# 可选依赖：cv2
+# 可选依赖：cv2（仅在 ffprobe 无法获取时长时才按需加载）
+cv2 = None
+CV2_AVAILABLE = None
+
+
+def _load_cv2():
+    """按需导入 OpenCV，结果缓存在模块全局；不可用时返回 None。"""
+    global cv2, CV2_AVAILABLE
+    if CV2_AVAILABLE is None:
+        try:
+            import cv2 as _cv2
+            cv2 = _cv2
+            CV2_AVAILABLE = True
+            log_info("[clip_video] OpenCV模块加载成功")
+        except ImportError as e:
+            CV2_AVAILABLE = False
+            log_warning(f"[clip_video] OpenCV模块导入失败: {e}")
+    return cv2 if CV2_AVAILABLE else None
+
+# 可选依赖：orjson（大分析文件解析/计划写入更快）
 try:
-    import cv2
-    CV2_AVAILABLE = True
-    log_info("[clip_video] OpenCV模块加载成功")
-except ImportError as e:
-    CV2_AVAILABLE = False
-    log_warning(f"[clip_video] OpenCV模块导入失败: {e}")
-    log_info("[clip_video] 将使用替代方法处理视频信息")
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _load_json_file(path):
+    """读取 JSON 文件；优先使用 orjson，不可用或无法解析时回退标准库。"""
+    raw = Path(path).read_bytes()
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson 不接受 NaN/Infinity，而 json.dump 会写出（如分析分数）
+            pass
+    return json.loads(raw)
+
+
+def _dump_json_file(path, data):
+    """以缩进格式写出 JSON（保留非 ASCII 字符）；orjson 无法序列化时回退标准库。"""
+    if ORJSON_AVAILABLE:
+        try:
+            payload = orjson.dumps(
+                data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            )
+            Path(path).write_bytes(payload)
+            return
+        except TypeError:
+            pass
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+# ffprobe 结果缓存：键为 (路径, mtime_ns, 文件大小)，文件被重写后自动失效
+_PROBE_CACHE: Dict[tuple, tuple] = {}
+
 
 def _probe_clip_info(output_path):
     """使用 ffprobe 检查输出文件的时长与是否包含视频流。
     返回 (has_video_stream: bool, has_audio_stream: bool, duration_seconds: float)
     """
     try:
+        st = os.stat(output_path)
+        cache_key = (os.path.abspath(output_path), st.st_mtime_ns, st.st_size)
+    except OSError:
+        return False, False, 0.0
+    cached = _PROBE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        # 只取流类型与容器时长，输出仅几百字节
         cmd = [
-            'ffprobe', '-v', 'quiet', '-print_format', 'json',
-            '-show_format', '-show_streams', output_path
+            'ffprobe', '-v', 'quiet', *_probe_input_args(output_path), '-print_format', 'json',
+            '-show_entries', 'stream=codec_type:format=duration', output_path
         ]
         pr = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='ignore', timeout=15)
         if pr.returncode != 0:
             return False, False, 0.0
-        import json as _json
-        info = _json.loads(pr.stdout or '{}')
+        info = json.loads(pr.stdout or '{}')
         streams = info.get('streams', []) or []
         has_video = any(s.get('codec_type') == 'video' for s in streams)
         has_audio = any(s.get('codec_type') == 'audio' for s in streams)
@@ -125,16 +220,36 @@ def _probe_clip_info(output_path):
             duration = float((info.get('format') or {}).get('duration') or 0.0)
         except Exception:
             duration = 0.0
-        return has_video, has_audio, duration
+        result = (has_video, has_audio, duration)
+        _PROBE_CACHE[cache_key] = result
+        return result
     except Exception:
         return False, False, 0.0
 
+def _probe_input_args(input_path):
+    """MP4/MOV 类输入的流信息都在 moov 头里，缩小 probesize/analyzeduration 可缩短启动时间。
+    其它容器（ts/flv 等）保持 ffmpeg 默认探测，避免漏检晚出现的音频流。"""
+    if Path(str(input_path)).suffix.lower() not in FAST_PROBE_SUFFIXES:
+        return []
+    cm = getattr(config, "config_manager", None)
+    probe_size = FFMPEG_PROBE_SIZE
+    analyze_duration = FFMPEG_ANALYZE_DURATION
+    try:
+        if cm is not None:
+            probe_size = str(cm.get("FFMPEG_PROBE_SIZE", probe_size) or probe_size)
+            analyze_duration = str(cm.get("FFMPEG_ANALYZE_DURATION", analyze_duration) or analyze_duration)
+    except Exception:
+        pass
+    return ["-probesize", probe_size, "-analyzeduration", analyze_duration]
+
 def cut_video_ffmpeg(input_path, output_path, start_time, duration):
     """使用FFmpeg快速切片，优先流拷贝；若检测到异常（0秒/无视频流），自动回退重编码。"""
+    probe_args = _probe_input_args(input_path)
     fast_cmd = [
         "ffmpeg", "-y",
         "-hide_banner", "-loglevel", "error", "-nostdin",
         "-ss", str(start_time),
+        *probe_args,
         "-i", input_path,
         "-t", str(duration),
         "-map", "0:v:0",
@@ -145,7 +260,18 @@ def cut_video_ffmpeg(input_path, output_path, start_time, duration):
         "-movflags", "+faststart",
         output_path
     ]
-    subprocess.run(fast_cmd, check=True)
+    fast_result = subprocess.run(fast_cmd, check=True, stderr=subprocess.PIPE)
+
+    # 流拷贝成功且输出体积正常、无错误输出时直接信任结果，省去一次 ffprobe
+    try:
+        output_size = os.path.getsize(output_path)
+    except OSError:
+        output_size = 0
+    fast_stderr = (fast_result.stderr or b"").strip()
+    if output_size >= FAST_COPY_TRUSTED_BYTES and not fast_stderr:
+        return
+    if fast_stderr:
+        log_debug(f"[clip_video] 流拷贝输出告警: {fast_stderr.decode('utf-8', errors='ignore')[:300]}")
 
     # 校验输出，避免生成0秒文件
     has_v, has_a, dur = _probe_clip_info(output_path)
@@ -155,6 +281,7 @@ def cut_video_ffmpeg(input_path, output_path, start_time, duration):
             "ffmpeg", "-y",
             "-hide_banner", "-loglevel", "error", "-nostdin",
             "-ss", str(start_time),
+            *probe_args,
             "-i", input_path,
             "-t", str(duration),
             "-map", "0:v:0",
@@ -213,12 +340,13 @@ def generate_clips_from_segments(video_path, segments, output_dir, progress_call
             
             # 清理可能存在的旧文件
             for stale in (output_path, tmp_output_path):
-                if os.path.exists(stale):
-                    try:
-                        os.remove(stale)
-                        log_info(f"[clip_video] 清理旧文件: {stale}")
-                    except Exception as e:
-                        log_warning(f"[clip_video] 清理旧文件失败: {e}")
+                try:
+                    os.unlink(stale)
+                    log_info(f"[clip_video] 清理旧文件: {stale}")
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    log_warning(f"[clip_video] 清理旧文件失败: {e}")
             
             log_info(
                 f"[clip_video] 生成切片 {i+1}/{len(segments)}: {clip_filename} "
@@ -230,18 +358,24 @@ def generate_clips_from_segments(video_path, segments, output_dir, progress_call
             try:
                 # 先写入临时文件，再原子 rename，避免半写文件
                 cut_video_ffmpeg(video_path, tmp_output_path, start_time, duration)
-                if os.path.exists(tmp_output_path):
-                    try:
-                        os.replace(tmp_output_path, output_path)
-                    except Exception:
-                        # 如果 rename 失败，尝试复制后删除
-                        import shutil
-                        shutil.copy2(tmp_output_path, output_path)
-                        os.remove(tmp_output_path)
-                
-                if os.path.exists(output_path):
+                try:
+                    os.replace(tmp_output_path, output_path)
+                except FileNotFoundError:
+                    pass
+                except Exception:
+                    # 如果 rename 失败，尝试复制后删除
+                    import shutil
+                    shutil.copy2(tmp_output_path, output_path)
+                    os.remove(tmp_output_path)
+
+                try:
+                    output_size = os.stat(output_path).st_size
+                except OSError:
+                    output_size = 0
+
+                if output_size > 0:
                     clip_files.append(output_path)
-                    size_mb = os.path.getsize(output_path) / (1024 * 1024)
+                    size_mb = output_size / (1024 * 1024)
                     log_info(f"[clip_video] 切片生成成功: {clip_filename} ({size_mb:.2f} MB)")
                     try:
                         report_path = os.path.join(output_dir, f"{Path(clip_filename).stem}.report.json")
@@ -280,6 +414,9 @@ def generate_clips_from_segments(video_path, segments, output_dir, progress_call
             except subprocess.CalledProcessError as e:
                 log_error(f"[clip_video] FFmpeg切片失败: {clip_filename}")
                 log_error(f"[clip_video] FFmpeg错误: {e}")
+                stderr = e.stderr.decode("utf-8", errors="ignore").strip() if isinstance(e.stderr, bytes) else (e.stderr or "")
+                if stderr:
+                    log_error(f"[clip_video] FFmpeg输出: {stderr[-2000:]}")
                 
         except Exception as e:
             log_error(f"[clip_video] 生成切片 {i+1} 时出错: {e}")
@@ -288,7 +425,14 @@ def generate_clips_from_segments(video_path, segments, output_dir, progress_call
     return clip_files
 
 def get_video_duration(video_path):
-    """获取视频时长"""
+    """获取视频时长：优先 ffprobe，失败时再回退 OpenCV"""
+    _, _, probed = _probe_clip_info(video_path)
+    if probed > 0:
+        return probed
+    cv2 = _load_cv2()
+    if cv2 is None:
+        log_error("[clip_video] 获取视频时长失败: ffprobe 与 OpenCV 均不可用")
+        return 0
     try:
         cap = cv2.VideoCapture(video_path)
         fps = cap.get(cv2.CAP_PROP_FPS)
@@ -320,8 +464,7 @@ def clip_video(video_path, analysis_file, output_dir, progress_callback=None, au
 
     # 读取分析结果
     try:
-        with open(analysis_file, 'r', encoding='utf-8') as f:
-            raw = json.load(f)
+        raw = _load_json_file(analysis_file)
         segments = _normalize_segments_data(raw)
         log_info(f"[clip_video] 成功读取分析结果文件: {analysis_file}")
         log_info(f"[clip_video] 分析结果包含 {len(segments)} 个片段")
@@ -369,43 +512,13 @@ def clip_video(video_path, analysis_file, output_dir, progress_callback=None, au
     # 🆕 调试：检查传入的segments数据
     log_info(f"[clip_video] 收到 {len(segments)} 个片段")
     
-    # 🆕 过滤无效片段
-    valid_segments = []
-    min_seg_seconds = _get_min_clip_segment_seconds()
-    for i, seg in enumerate(segments):
-        start = seg.get('start', 0)
-        end = seg.get('end', 0)
-        score = seg.get('score', 0)
-        
-        # 检查片段有效性
-        if start >= end:
-            log_warning(f"[clip_video] 跳过无效片段 {i+1}: start({start}) >= end({end})")
-            continue
-            
-        if score <= 0:
-            log_warning(f"[clip_video] 跳过低分片段 {i+1}: score={score}")
-            continue
-
-        if end - start < min_seg_seconds:
-            log_warning(
-                f"[clip_video] 跳过过短片段 {i+1}: 持续时间={end-start:.1f}s (<{min_seg_seconds:.1f}s)"
-            )
-            continue
-
-        valid_segments.append(seg)
-        label = ""
-        if seg.get("reason_tags"):
-            label = f" tags={','.join(seg.get('reason_tags'))}"
-        elif seg.get("text"):
-            label = f" text={seg.get('text')[:30]}"
-        log_info(f"[clip_video] 有效片段 {len(valid_segments)}: {start:.1f}s-{end:.1f}s, 评分={score:.3f}{label}")
-    
-    if len(valid_segments) == 0:
+    # 🆕 过滤无效片段（保持 _normalize_segments_data 给出的排名顺序）
+    segments = list(_iter_valid_segments(segments, _get_min_clip_segment_seconds()))
+    if not segments:
         log_error("[clip_video] ❌ 没有有效的片段数据！")
         return []
         
-    log_info(f"[clip_video] 过滤后剩余 {len(valid_segments)} 个有效片段")
-    segments = valid_segments  # 使用过滤后的片段
+    log_info(f"[clip_video] 过滤后剩余 {len(segments)} 个有效片段")
     
     cm = getattr(config, "config_manager", None)
 
@@ -550,12 +663,17 @@ def clip_video(video_path, analysis_file, output_dir, progress_callback=None, au
 
         return start, end
 
+    # 一次性抽取 start/end/score 列（_normalize_segments_data 已保证为 float）
+    starts_list = [seg['start'] for seg in segments]
+    ends_list = [seg['end'] for seg in segments]
+    scores_list = [seg['score'] for seg in segments]
+
     if semantic_mode:
         for idx, seg in enumerate(segments):
             if len(processed_segments) >= max_clips:
                 break
-            clip_start = float(seg.get('start', 0.0))
-            clip_end = float(seg.get('end', 0.0))
+            clip_start = starts_list[idx]
+            clip_end = ends_list[idx]
             duration = clip_end - clip_start
             if duration <= 1.0:
                 log_warning(f"[clip_video] 跳过时长不足的语义窗口 #{idx+1}: {duration:.1f}s")
@@ -564,7 +682,7 @@ def clip_video(video_path, analysis_file, output_dir, progress_callback=None, au
                 {
                     'start': clip_start,
                     'end': clip_end,
-                    'score': float(seg.get('score', 0.0)),
+                    'score': scores_list[idx],
                     'text': seg.get('text', ''),
                     'analysis_rank': idx + 1,
                     'source_start': clip_start,
@@ -576,15 +694,15 @@ def clip_video(video_path, analysis_file, output_dir, progress_callback=None, au
             )
             log_info(
                 f"[clip_video] 语义窗口 #{len(processed_segments)}: {clip_start:.1f}-{clip_end:.1f}s "
-                f"(≈{duration/60:.2f}min, score={seg.get('score', 0)})"
+                f"(≈{duration/60:.2f}min, score={scores_list[idx]})"
             )
     else:
         for idx, seg in enumerate(segments):
             if len(processed_segments) >= max_clips:
                 break
 
-            base_start = float(seg.get('start', 0.0))
-            base_end = float(seg.get('end', 0.0))
+            base_start = starts_list[idx]
+            base_end = ends_list[idx]
             if base_end - base_start <= 0:
                 log_warning(f"[clip_video] 跳过长度异常的片段 #{idx+1}")
                 continue
@@ -602,7 +720,7 @@ def clip_video(video_path, analysis_file, output_dir, progress_callback=None, au
             processed_segments.append({
                 'start': clip_start,
                 'end': clip_end,
-                'score': float(seg.get('score', 0.0)),
+                'score': scores_list[idx],
                 'text': seg.get('text', ''),
                 'analysis_rank': idx + 1,
                 'source_start': base_start,
@@ -613,7 +731,7 @@ def clip_video(video_path, analysis_file, output_dir, progress_callback=None, au
             })
             log_info(f"[clip_video] 生成窗口 #{len(processed_segments)} "
                      f"来自排名#{idx+1}: {clip_start:.1f}-{clip_end:.1f}s "
-                     f"(≈{duration/60:.2f}min, score={seg.get('score', 0)})")
+                     f"(≈{duration/60:.2f}min, score={scores_list[idx]})")
 
     if not processed_segments:
         log_error("[clip_video] ❌ 未能生成任何符合条件的切片窗口")
@@ -643,8 +761,7 @@ def clip_video(video_path, analysis_file, output_dir, progress_callback=None, au
         "total_segments": len(processed_segments)
     }
     
-    with open(plan_file, 'w', encoding='utf-8') as f:
-        json.dump(plan_data, f, ensure_ascii=False, indent=2)
+    _dump_json_file(plan_file, plan_data)
     
     log_info(f"[clip_video] 切片计划已保存到: {plan_file}")
     
@@ -654,7 +771,10 @@ def clip_video(video_path, analysis_file, output_dir, progress_callback=None, au
     # 汇总输出
     log_info(f"[clip_video] 切片任务完成: 成功 {len(clip_files)} / 计划 {len(processed_segments)}")
     for i, path in enumerate(clip_files, 1):
-        size_mb = os.path.getsize(path) / (1024 * 1024) if os.path.exists(path) else 0
+        try:
+            size_mb = os.stat(path).st_size / (1024 * 1024)
+        except OSError:
+            size_mb = 0
         log_info(f"[clip_video] 成品#{i:03d} {path} ({size_mb:.2f} MB)")
 
     return clip_files
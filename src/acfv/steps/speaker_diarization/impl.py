@@ -11,18 +11,20 @@ import json
 import time
 import pickle
 import hashlib
+import shutil
 import tempfile
 import threading
 import subprocess
 from pathlib import Path
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import numpy as np
 from tqdm.auto import tqdm
 from acfv.runtime.token_loader import get_hf_token
 
 # 解决OpenMP冲突 - 必须在导入其他库之前设置
+# 不再强制 OMP/MKL 单线程：CPU 推理时由 _move_pipeline_to_device 设置 torch 线程数
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
-os.environ['OMP_NUM_THREADS'] = '1'
-os.environ['MKL_NUM_THREADS'] = '1'
 
 # 统一 HuggingFace token 处理
 HF_TOKEN_AVAILABLE = bool(get_hf_token())
@@ -46,6 +48,46 @@ try:
 except ImportError:
     print("⚠️ transcribe_audio模块不可用")
 
+# 模块级共享的 pyannote 管线，避免每次处理都重新加载数百 MB 权重
+DIARIZATION_MODEL = "pyannote/speaker-diarization-3.1"
+_PIPELINE_CACHE = {}
+_PIPELINE_LOCK = threading.Lock()
+
+
+# ffmpeg 公共参数：只输出错误、不读 stdin（并发运行时避免抢占终端）
+FFMPEG_BASE_ARGS = ['-hide_banner', '-loglevel', 'error', '-nostdin', '-y']
+
+
+def _ffmpeg_cmd(*args):
+    """构建低优先级 ffmpeg 命令；POSIX 上通过 nice 降低优先级，避免挤占 pyannote 推理线程"""
+    prefix = ['nice', '-n', '10'] if os.name != 'nt' and shutil.which('nice') else []
+    return prefix + ['ffmpeg', *FFMPEG_BASE_ARGS, *args]
+
+
+def _run_ffmpeg(cmd, timeout):
+    """运行 ffmpeg：stdin 置空，Windows 上使用低于正常的进程优先级"""
+    kwargs = {}
+    if os.name == 'nt':
+        kwargs['creationflags'] = getattr(subprocess, 'BELOW_NORMAL_PRIORITY_CLASS', 0)
+    return subprocess.run(
+        cmd, stdin=subprocess.DEVNULL, capture_output=True, text=True,
+        encoding='utf-8', errors='ignore', timeout=timeout, **kwargs
+    )
+
+
+@dataclass
+class Seg:
+    """说话人片段（__slots__ 紧凑存储，取代逐段复制的 dict）"""
+    __slots__ = ('start', 'end', 'duration', 'speaker')
+    start: float
+    end: float
+    duration: float
+    speaker: str
+
+    def as_dict(self):
+        return {'start': self.start, 'end': self.end, 'duration': self.duration, 'speaker': self.speaker}
+
+
 class SpeakerDiarizationProcessor:
     """说话人识别处理器 - 独立模块版本"""
     
@@ -64,82 +106,93 @@ class SpeakerDiarizationProcessor:
         """停止处理"""
         self._should_stop = True
     
-    def _expand_segments(self, segments, padding=0.3):
-        """扩展片段边界，避免语音被切断，但保留短促声音"""
-        expanded_segments = []
-        for i, segment in enumerate(segments):
-            new_segment = segment.copy()
-            
-            # 根据片段时长调整padding
-            duration = segment['duration']
-            if duration < 1.0:  # 短促声音（如笑声）
-                # 对短声音使用较小的padding
-                adjusted_padding = min(padding * 0.5, 0.2)
-            else:
-                # 对长声音使用正常padding
-                adjusted_padding = padding
-            
-            new_segment['start'] = max(0, segment['start'] - adjusted_padding)
-            
-            if i < len(segments) - 1:
-                next_start = segments[i + 1]['start']
-                # 避免与下一个片段重叠
-                max_end = min(segment['end'] + adjusted_padding, next_start - 0.05)
-                new_segment['end'] = max_end
-            else:
-                new_segment['end'] = segment['end'] + adjusted_padding
-            
-            new_segment['duration'] = new_segment['end'] - new_segment['start']
-            expanded_segments.append(new_segment)
+    @staticmethod
+    def _tracks_to_arrays(diarization):
+        """pyannote 输出 -> 列式数组 (starts, ends, speakers)，不为每条轨迹创建 dict"""
+        tracks = list(diarization.itertracks(yield_label=True))
+        n = len(tracks)
+        starts = np.empty(n, dtype=np.float64)
+        ends = np.empty(n, dtype=np.float64)
+        speakers = np.empty(n, dtype=object)
+        for i, (turn, _, speaker) in enumerate(tracks):
+            starts[i] = turn.start
+            ends[i] = turn.end
+            speakers[i] = speaker
+        return starts, ends, speakers
+
+    @staticmethod
+    def _arrays_to_segments(starts, ends, speakers):
+        """列式数组 -> Seg 列表"""
+        return [
+            Seg(s, e, e - s, sp)
+            for s, e, sp in zip(starts.tolist(), ends.tolist(), list(speakers))
+        ]
+
+    def _expand_segments(self, starts, ends, speakers, padding=0.3):
+        """扩展片段边界，避免语音被切断，但保留短促声音；输入输出均为列式数组"""
+        if not len(starts):
+            return starts, ends, speakers
+        # 短促声音（如笑声，<1秒）使用较小的padding，长声音使用正常padding
+        adj_pad = np.where(ends - starts < 1.0, min(padding * 0.5, 0.2), padding)
+        new_starts = np.maximum(0.0, starts - adj_pad)
+        new_ends = ends + adj_pad
+        # 避免与下一个片段重叠
+        new_ends[:-1] = np.minimum(new_ends[:-1], starts[1:] - 0.05)
+        return new_starts, new_ends, speakers
+
+    @staticmethod
+    def _merge_speaker_run(starts, ends, max_gap):
+        """合并单个说话人（已按开始时间排序）的片段，返回合并后的 (starts, ends)"""
+        gap = starts[1:] - ends[:-1]
+        merge = (gap <= max_gap) & (gap <= 0.5)
+        # 两个都是短促声音（<1秒）时也合并，但这取决于当前合并块的累计时长，只能顺序判断
+        short_candidates = (gap <= max_gap) & ~merge & (ends[1:] - starts[1:] < 1.0)
+        if not short_candidates.any():
+            first = np.flatnonzero(np.concatenate(([True], ~merge)))
+            last = np.append(first[1:] - 1, len(starts) - 1)
+            return starts[first], ends[last]
         
-        return expanded_segments
+        out_starts, out_ends = [], []
+        g_starts = starts.tolist()
+        g_ends = ends.tolist()
+        cur_start, cur_end = g_starts[0], g_ends[0]
+        for seg_start, seg_end in zip(g_starts[1:], g_ends[1:]):
+            gap = seg_start - cur_end
+            # 智能合并策略：间隔很小，或两个都是短促声音（<1秒，如笑声）时合并
+            if gap <= max_gap and (
+                gap <= 0.5 or ((seg_end - seg_start) < 1.0 and (cur_end - cur_start) < 1.0)
+            ):
+                cur_end = seg_end
+            else:
+                out_starts.append(cur_start)
+                out_ends.append(cur_end)
+                cur_start, cur_end = seg_start, seg_end
+        out_starts.append(cur_start)
+        out_ends.append(cur_end)
+        return np.asarray(out_starts), np.asarray(out_ends)
 
-    def _merge_close_segments(self, segments, max_gap=2.0):
-        """合并相近的同一说话人片段，但保留短促声音如笑声"""
-        if not segments:
-            return segments
+    def _merge_close_segments(self, starts, ends, speakers, max_gap=2.0):
+        """合并相近的同一说话人片段，但保留短促声音如笑声；返回 Seg 列表"""
+        if not len(starts):
+            return []
         
-        speaker_segments = {}
-        for seg in segments:
-            speaker = seg['speaker']
-            if speaker not in speaker_segments:
-                speaker_segments[speaker] = []
-            speaker_segments[speaker].append(seg)
+        # 说话人按首次出现顺序编号，一次稳定排序 (说话人, 开始时间) 后按边界切分各组
+        labels, first_idx, inverse = np.unique(speakers, return_index=True, return_inverse=True)
+        rank = np.empty(len(labels), dtype=np.int64)
+        rank[np.argsort(first_idx, kind='stable')] = np.arange(len(labels))
+        codes = rank[inverse.ravel()]
+        order = np.lexsort((starts, codes))
+        starts, ends, codes = starts[order], ends[order], codes[order]
+        bounds = np.flatnonzero(codes[1:] != codes[:-1]) + 1
         
-        merged_segments = []
-        for speaker, segs in speaker_segments.items():
-            segs.sort(key=lambda x: x['start'])
-            current = None
-            
-            for seg in segs:
-                if current is None:
-                    current = seg.copy()
-                else:
-                    gap = seg['start'] - current['end']
-                    
-                    # 智能合并策略：保留短促声音
-                    if gap <= max_gap:
-                        # 检查是否是短促声音（如笑声）
-                        is_short_sound = seg['duration'] < 1.0  # 小于1秒的声音
-                        is_current_short = current['duration'] < 1.0
-                        
-                        # 如果两个都是短声音，或者间隔很小，则合并
-                        if gap <= 0.5 or (is_short_sound and is_current_short):
-                            current['end'] = seg['end']
-                            current['duration'] = current['end'] - current['start']
-                        else:
-                            # 保存当前片段，开始新片段
-                            merged_segments.append(current)
-                            current = seg.copy()
-                    else:
-                        # 间隔太大，保存当前片段，开始新片段
-                        merged_segments.append(current)
-                        current = seg.copy()
-            
-            if current:
-                merged_segments.append(current)
+        out_starts, out_ends, out_speakers = [], [], []
+        for lo, hi in zip(np.append(0, bounds), np.append(bounds, len(codes))):
+            g_starts, g_ends = self._merge_speaker_run(starts[lo:hi], ends[lo:hi], max_gap)
+            out_starts.append(g_starts)
+            out_ends.append(g_ends)
+            out_speakers.extend([speakers[order[lo]]] * len(g_starts))
         
-        return merged_segments
+        return self._arrays_to_segments(np.concatenate(out_starts), np.concatenate(out_ends), out_speakers)
 
     def _load_whisper_model(self):
         """加载Whisper模型"""
@@ -156,30 +209,98 @@ class SpeakerDiarizationProcessor:
             print(f"Whisper模型加载失败: {e}")
             return None
 
+    def _move_pipeline_to_device(self, pipeline):
+        """CUDA 可用时把 pyannote 管线移到 GPU；否则让分割/嵌入网络使用多核 CPU"""
+        try:
+            import torch
+        except ImportError:
+            return
+        try:
+            if torch.cuda.is_available():
+                pipeline.to(torch.device("cuda"))
+                self.progress_callback("分离", "⚡ 使用GPU进行说话人分离", 42)
+                return
+        except Exception as e:
+            print(f"说话人分离管线迁移到GPU失败，使用CPU: {e}")
+        try:
+            torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+        except Exception:
+            pass
+
+    def _get_pipeline(self, pipeline_cls, token):
+        """获取模块级共享的 pyannote 管线；首次调用时加载权重、设置参数并迁移设备"""
+        with _PIPELINE_LOCK:
+            pipeline = _PIPELINE_CACHE.get(DIARIZATION_MODEL)
+            if pipeline is not None:
+                return pipeline
+            
+            pipeline = pipeline_cls.from_pretrained(
+                DIARIZATION_MODEL,
+                use_auth_token=token
+            )
+            
+            # 优化参数以提高速度和识别非语音声音
+            try:
+                pipeline.instantiate({
+                    # 优化分割参数 - 降低最小时长以捕获笑声等短声音
+                    "segmentation": {
+                        "min_duration": 0.1,  # 降低最小片段时长，捕获短促声音
+                        "max_duration": 30.0,  # 设置最大片段时长
+                        "threshold": 0.5,  # 降低阈值以捕获更多声音
+                        "min_activity": 0.1  # 降低最小活动度
+                    },
+                    # 优化聚类参数 - 提高对非语音声音的敏感度
+                    "clustering": {
+                        "method": "centroid",
+                        "min_cluster_size": 1,  # 降低最小聚类大小
+                        "threshold": 0.25,  # 降低聚类阈值，更敏感
+                        "covariance_type": "diag"  # 使用对角协方差矩阵，提高速度
+                    },
+                })
+            except Exception as e:
+                print(f"参数优化失败，使用默认参数: {e}")
+            
+            self._move_pipeline_to_device(pipeline)
+            _PIPELINE_CACHE[DIARIZATION_MODEL] = pipeline
+            return pipeline
+
+    def _audio_cache_path(self):
+        """按视频内容指纹（首尾各 1MiB + 文件大小）生成提取音频的缓存路径"""
+        size = os.path.getsize(self.video_path)
+        h = hashlib.blake2b(digest_size=16)
+        with open(self.video_path, 'rb') as f:
+            h.update(f.read(1 << 20))
+            f.seek(max(0, size - (1 << 20)))
+            h.update(f.read(1 << 20))
+        h.update(str(size).encode())
+        return Path(self.output_dir) / f"{h.hexdigest()}_audio.wav"
+
     def _extract_audio_from_video(self):
-        """从视频中提取音频"""
+        """从视频中提取音频（同一视频内容复用已提取的音频）"""
         try:
-            # 生成安全的文件名
-            video_name = os.path.splitext(os.path.basename(self.video_path))[0]
-            safe_name = "".join(c for c in video_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            safe_name = safe_name[:30]  # 限制长度
+            audio_path = str(self._audio_cache_path())
+            if os.path.exists(audio_path) and os.path.getsize(audio_path) > 0:
+                return audio_path
             
-            audio_path = os.path.join(self.output_dir, f"{safe_name}_audio.wav")
+            # 先写入临时文件再改名，避免中断留下的半成品被当作缓存命中
+            tmp_path = audio_path + ".part"
             
             # 使用ffmpeg提取音频
-            cmd = [
-                'ffmpeg', '-y',
+            cmd = _ffmpeg_cmd(
                 '-i', self.video_path,
                 '-vn',  # 不包含视频
                 '-acodec', 'pcm_s16le',  # 16位PCM编码
                 '-ar', '16000',  # 16kHz采样率
                 '-ac', '1',  # 单声道
-                audio_path
-            ]
+                '-threads', '0',
+                '-f', 'wav',
+                tmp_path
+            )
             
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='ignore', timeout=300)
+            result = _run_ffmpeg(cmd, timeout=300)
             
-            if result.returncode == 0 and os.path.exists(audio_path):
+            if result.returncode == 0 and os.path.exists(tmp_path):
+                os.replace(tmp_path, audio_path)
                 return audio_path
             else:
                 print(f"音频提取失败: {result.stderr}")
@@ -197,17 +318,17 @@ class SpeakerDiarizationProcessor:
         # 统计每个说话人的总时长
         speaker_duration = {}
         for segment in segments:
-            speaker = segment['speaker']
+            speaker = segment.speaker
             if speaker not in speaker_duration:
                 speaker_duration[speaker] = 0
-            speaker_duration[speaker] += segment['duration']
+            speaker_duration[speaker] += segment.duration
         
         # 返回说话时间最长的人
         host_speaker = max(speaker_duration.items(), key=lambda x: x[1])[0]
         return host_speaker
 
     def _generate_host_audio(self, host_segments, audio_path):
-        """生成主播音频文件"""
+        """生成主播音频文件：优先用 concat 分离器流拷贝，失败时回退 filter_complex 重编码"""
         if not host_segments:
             return None
         
@@ -218,12 +339,51 @@ class SpeakerDiarizationProcessor:
             safe_name = safe_name[:20]  # 限制长度
             
             host_audio_file = os.path.join(self.output_dir, f"{safe_name}_host_audio.wav")
+            concat_list = os.path.join(self.output_dir, f"{safe_name}_host_concat.txt")
+            
+            # concat 分离器按 inpoint/outpoint 直接截取 PCM，无需为每个片段构建 atrim 节点
+            self._write_concat_list(host_segments, audio_path, concat_list)
+            cmd = _ffmpeg_cmd(
+                '-f', 'concat', '-safe', '0',
+                '-i', concat_list,
+                '-c', 'copy',
+                host_audio_file
+            )
+            try:
+                result = _run_ffmpeg(cmd, timeout=1000)
+            finally:
+                try:
+                    os.unlink(concat_list)
+                except OSError:
+                    pass
             
+            if result.returncode == 0 and os.path.exists(host_audio_file):
+                return host_audio_file
+            print(f"concat 流拷贝失败，回退 filter_complex: {result.stderr}")
+            return self._generate_host_audio_filter(host_segments, audio_path, host_audio_file)
+                
+        except Exception as e:
+            print(f"音频生成异常: {e}")
+            return None
+
+    def _write_concat_list(self, host_segments, audio_path, list_path):
+        """写出 ffmpeg concat 分离器列表：每个片段引用同一音频的 inpoint/outpoint"""
+        source = os.path.abspath(audio_path).replace('\\', '/').replace("'", "'\\''")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for segment in host_segments:
+                start = segment.start
+                f.write(f"file '{source}'\n")
+                f.write(f"inpoint {start:.3f}\n")
+                f.write(f"outpoint {start + segment.duration:.3f}\n")
+
+    def _generate_host_audio_filter(self, host_segments, audio_path, host_audio_file):
+        """回退方案：filter_complex atrim + concat 重编码生成主播音频"""
+        try:
             # 创建ffmpeg过滤器字符串
             filter_parts = []
             for i, segment in enumerate(host_segments):
-                start = segment['start']
-                duration = segment['duration']
+                start = segment.start
+                duration = segment.duration
                 filter_parts.append(f"[0:a]atrim=start={start}:duration={duration},asetpts=PTS-STARTPTS[a{i}]")
             
             # 合并所有片段
@@ -236,15 +396,15 @@ class SpeakerDiarizationProcessor:
                 full_filter = filter_parts[0]
                 output_map = "[a0]"
             
-            cmd = [
-                'ffmpeg', '-y',
+            cmd = _ffmpeg_cmd(
                 '-i', audio_path,
                 '-filter_complex', full_filter,
                 '-map', output_map,
+                '-threads', '0',
                 host_audio_file
-            ]
+            )
             
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='ignore', timeout=1000)
+            result = _run_ffmpeg(cmd, timeout=1000)
             
             if result.returncode == 0 and os.path.exists(host_audio_file):
                 return host_audio_file
@@ -297,65 +457,31 @@ class SpeakerDiarizationProcessor:
             # 说话人分离
             self.progress_callback("分离", "🎤 开始说话人分离...", 40)
             
-            pipeline = Pipeline.from_pretrained(
-                "pyannote/speaker-diarization-3.1",
-                use_auth_token=token
-            )
-            
-            # 优化参数以提高速度和识别非语音声音
-            try:
-                pipeline.instantiate({
-                    # 优化分割参数 - 降低最小时长以捕获笑声等短声音
-                    "segmentation": {
-                        "min_duration": 0.1,  # 降低最小片段时长，捕获短促声音
-                        "max_duration": 30.0,  # 设置最大片段时长
-                        "threshold": 0.5,  # 降低阈值以捕获更多声音
-                        "min_activity": 0.1  # 降低最小活动度
-                    },
-                    # 优化聚类参数 - 提高对非语音声音的敏感度
-                    "clustering": {
-                        "method": "centroid",
-                        "min_cluster_size": 1,  # 降低最小聚类大小
-                        "threshold": 0.25,  # 降低聚类阈值，更敏感
-                        "covariance_type": "diag"  # 使用对角协方差矩阵，提高速度
-                    },
-                })
-            except Exception as e:
-                print(f"参数优化失败，使用默认参数: {e}")
+            pipeline = self._get_pipeline(Pipeline, token)
             
             # 执行说话人分离
             diarization = pipeline(audio_path)
             
             # 提取片段信息
-            segments = []
-            speakers = set()
-            
-            for turn, _, speaker in diarization.itertracks(yield_label=True):
-                segment = {
-                    'start': turn.start,
-                    'end': turn.end,
-                    'duration': turn.end - turn.start,
-                    'speaker': speaker
-                }
-                segments.append(segment)
-                speakers.add(speaker)
+            starts, ends, speaker_labels = self._tracks_to_arrays(diarization)
+            unique_speakers = np.unique(speaker_labels).tolist()
             
-            self.progress_callback("分离", f"✅ 说话人分离完成，识别到 {len(speakers)} 个说话人", 60)
+            self.progress_callback("分离", f"✅ 说话人分离完成，识别到 {len(unique_speakers)} 个说话人", 60)
             
             # 扩展和合并片段
             self.progress_callback("处理", "🔧 优化片段边界...", 65)
-            expanded_segments = self._expand_segments(segments)
-            merged_segments = self._merge_close_segments(expanded_segments)
+            expanded = self._expand_segments(starts, ends, speaker_labels)
+            merged_segments = self._merge_close_segments(*expanded)
             
             # 识别主播
             self.progress_callback("识别", "🎯 识别主播...", 70)
-            host_speaker = self._identify_host_speaker(merged_segments, speakers)
+            host_speaker = self._identify_host_speaker(merged_segments, unique_speakers)
             
             if host_speaker:
                 self.progress_callback("识别", f"✅ 主播识别完成: {host_speaker}", 75)
                 
                 # 提取主播片段
-                host_segments = [seg for seg in merged_segments if seg['speaker'] == host_speaker]
+                host_segments = [seg for seg in merged_segments if seg.speaker == host_speaker]
                 
                 # 生成主播音频
                 self.progress_callback("生成", "🎵 生成主播音频...", 80)
@@ -367,10 +493,10 @@ class SpeakerDiarizationProcessor:
                     'audio_path': audio_path,
                     'host_speaker': host_speaker,
                     'host_audio_path': host_audio_path,
-                    'all_segments': merged_segments,
-                    'host_segments': host_segments,
-                    'speakers': list(speakers),
-                    'total_speakers': len(speakers),
+                    'all_segments': [seg.as_dict() for seg in merged_segments],
+                    'host_segments': [seg.as_dict() for seg in host_segments],
+                    'speakers': unique_speakers,
+                    'total_speakers': len(unique_speakers),
                     'total_segments': len(merged_segments),
                     'host_segments_count': len(host_segments),
                     'processing_time': datetime.now().isoformat()
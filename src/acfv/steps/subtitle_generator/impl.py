@@ -1,20 +1,51 @@
 from __future__ import annotations
 
+import json
 import os
 import re
-import json
 import math
+from collections import Counter
 from typing import List, Dict, Any, Tuple
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from acfv.processing.subtitle_contract import generate_subtitle
 
+# Current naming: clip_001_00h00m00s_0-270000.mp4 (ms)
+_CLIP_TIME_MS_RE = re.compile(r"clip_\d+_[^_]+_(\d+)-(\d+)\.mp4$")
+# Legacy naming: clip_001_123.4s-234.5s.mp4
+_CLIP_TIME_SEC_RE = re.compile(r"clip_\d+_(\d+(?:\.\d+)?)s-(\d+(?:\.\d+)?)s\.mp4$")
+# Chinese and English sentence punctuation, captured so delimiters are kept
+_SENT_SPLIT_RE = re.compile(r"([。！？!?；;])")
+_COMMA_SPLIT_RE = re.compile(r"[，,]")
+# Below this many sentences sklearn setup dominates; compute TF-IDF in pure Python instead
+_SHORT_TEXT_LIMIT = 16
+# Same settings as the sklearn TfidfVectorizer (default token_pattern, max_features=1000)
+_TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+_TFIDF_MAX_FEATURES = 1000
+
+
+def _loads(raw: bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity, which json.dump writes (e.g. Whisper scores)
+            pass
+    return json.loads(raw)
+
 
 def _read_transcription(transcription_file: str) -> List[Dict[str, Any]]:
     if not transcription_file or not os.path.exists(transcription_file):
         return []
     try:
-        with open(transcription_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(transcription_file, 'rb') as f:
+            data = _loads(f.read())
         if isinstance(data, dict) and 'segments' in data:
             return data.get('segments', [])
         if isinstance(data, list):
@@ -25,15 +56,13 @@ def _read_transcription(transcription_file: str) -> List[Dict[str, Any]]:
 
 
 def _parse_clip_time_from_name(filename: str) -> Tuple[float, float]:
-    # Current naming: clip_001_00h00m00s_0-270000.mp4 (ms)
-    m = re.search(r"clip_\d+_[^_]+_(\d+)-(\d+)\.mp4$", filename)
+    m = _CLIP_TIME_MS_RE.search(filename)
     if m:
         start_ms = float(m.group(1))
         end_ms = float(m.group(2))
         if end_ms > start_ms:
             return start_ms / 1000.0, end_ms / 1000.0
-    # Legacy naming: clip_001_123.4s-234.5s.mp4
-    m = re.search(r"clip_\d+_(\d+(?:\.\d+)?)s-(\d+(?:\.\d+)?)s\.mp4$", filename)
+    m = _CLIP_TIME_SEC_RE.search(filename)
     if m:
         return float(m.group(1)), float(m.group(2))
     # fallback: no match
@@ -53,7 +82,7 @@ def _split_sentences(text: str) -> List[str]:
     if not text:
         return []
     # Split by Chinese and English punctuation, keep delimiters
-    parts = re.split(r"([。！？!?；;])", text)
+    parts = _SENT_SPLIT_RE.split(text)
     sentences = []
     buf = ""
     for i in range(0, len(parts), 2):
@@ -65,26 +94,90 @@ def _split_sentences(text: str) -> List[str]:
             buf = ""
     # Fallback: if nothing split, try by commas
     if not sentences and text:
-        sentences = [t.strip() for t in re.split(r"[，,]", text) if t.strip()]
+        sentences = [t.strip() for t in _COMMA_SPLIT_RE.split(text) if t.strip()]
     return sentences
 
 
-def _semantic_merge(sentences: List[Dict[str, Any]], sim_threshold: float, max_gap: float, min_chars: int) -> List[Dict[str, Any]]:
-    if not sentences:
-        return []
-    texts = [s['text'] for s in sentences]
-    if not any(texts):
-        return sentences
-    # Build TF-IDF vectors for similarity
+def _fit_vectorizer(texts: List[str]):
+    """Fit one TF-IDF vectorizer on the sentences of all clips; None if unavailable."""
     try:
         from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.metrics.pairwise import cosine_similarity
 
         vectorizer = TfidfVectorizer(max_features=1000, ngram_range=(1, 2))
-        X = vectorizer.fit_transform(texts)
-        sim = cosine_similarity(X)
+        vectorizer.fit(texts)
+        return vectorizer
+    except Exception:
+        return None
+
+
+def _adj_sim_short(texts: List[str]) -> List[float]:
+    """TF-IDF cosine similarity between neighbouring texts, in pure Python.
+
+    Mirrors TfidfVectorizer(max_features=1000, ngram_range=(1, 2)) fitted on
+    ``texts``, so the scores share the TF-IDF path's scale and
+    SEMANTIC_SIMILARITY_THRESHOLD means the same thing on both paths.
+    """
+    docs = []
+    for text in texts:
+        words = _TOKEN_RE.findall(text.lower())
+        docs.append(Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])]))
+    totals: Counter = Counter()
+    for doc in docs:
+        totals.update(doc)
+    if len(totals) > _TFIDF_MAX_FEATURES:
+        keep = set(sorted(totals, key=lambda term: (-totals[term], term))[:_TFIDF_MAX_FEATURES])
+        docs = [Counter({term: n for term, n in doc.items() if term in keep}) for doc in docs]
+    df: Counter = Counter()
+    for doc in docs:
+        df.update(doc.keys())
+    # Smoothed idf and L2-normalized rows, as sklearn does by default
+    idf = {term: math.log((1 + len(docs)) / (1 + n)) + 1.0 for term, n in df.items()}
+    vecs = []
+    for doc in docs:
+        weights = {term: n * idf[term] for term, n in doc.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        vecs.append({term: w / norm for term, w in weights.items()} if norm else {})
+    return [
+        sum(w * b.get(term, 0.0) for term, w in a.items())
+        for a, b in zip(vecs, vecs[1:])
+    ]
+
+
+def _adj_sim_tfidf(texts: List[str], vectorizer=None):
+    """TF-IDF cosine similarity between neighbouring texts; None if sklearn is unavailable."""
+    try:
+        if vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+
+            vectorizer = TfidfVectorizer(max_features=1000, ngram_range=(1, 2))
+            X = vectorizer.fit_transform(texts)
+        else:
+            X = vectorizer.transform(texts)
+        X = X.tocsr()  # rows are L2-normalized by default
+        return np.asarray(X[:-1].multiply(X[1:]).sum(axis=1)).ravel()
     except Exception:
-        sim = None
+        return None
+
+
+def _semantic_merge(
+    sentences: List[Dict[str, Any]],
+    sim_threshold: float,
+    max_gap: float,
+    min_chars: int,
+    vectorizer=None,
+) -> List[Dict[str, Any]]:
+    if not sentences:
+        return []
+    texts = [s['text'] for s in sentences]
+    if not any(texts):
+        return sentences
+    # Only neighbouring sentences are compared, so compute adjacent similarities
+    # directly. Short inputs skip sklearn setup and compute the same TF-IDF cosine
+    # in pure Python, so sim_threshold applies unchanged to both paths.
+    if len(texts) < _SHORT_TEXT_LIMIT:
+        sim = _adj_sim_short(texts)
+    else:
+        sim = _adj_sim_tfidf(texts, vectorizer)
 
     merged: List[Dict[str, Any]] = []
     cur = sentences[0].copy()
@@ -95,7 +188,7 @@ def _semantic_merge(sentences: List[Dict[str, Any]], sim_threshold: float, max_g
         nxt_len = len(nxt['text'])
         similar = False
         if sim is not None:
-            similar = (sim[i-1][i] if i-1 < sim.shape[0] and i < sim.shape[1] else 0.0) >= sim_threshold
+            similar = (sim[i-1] if i-1 < len(sim) else 0.0) >= sim_threshold
         # Merge if very short or similar and gap small
         if (cur_len < min_chars or nxt_len < min_chars or similar) and time_gap <= max_gap:
             cur['text'] = (cur['text'] + " " + nxt['text']).strip()
@@ -126,23 +219,53 @@ def _build_sentence_chunks(segments: List[Dict[str, Any]], clip_start: float, cl
         sentences = _split_sentences(text)
         if not sentences:
             continue
-        # Allocate time proportionally within this segment
-        total_chars = sum(len(t) for t in sentences)
-        if total_chars <= 0:
+        # Allocate time proportionally within this segment (cumulative char share)
+        cum = np.cumsum(np.fromiter(map(len, sentences), dtype=np.int64, count=len(sentences)))
+        if cum[-1] <= 0:
             continue
-        dur = e2 - s2
-        t_cursor = s2
-        for sent in sentences:
-            frac = len(sent) / total_chars if total_chars > 0 else 0
-            sd = t_cursor
-            ed = min(clip_end, sd + dur * frac)
-            t_cursor = ed
-            chunks.append({'start': sd, 'end': ed, 'text': sent})
+        ends = np.minimum(s2 + (cum / cum[-1]) * (e2 - s2), clip_end)
+        starts = np.concatenate(([s2], ends[:-1]))
+        chunks.extend(
+            {'start': sd, 'end': ed, 'text': sent}
+            for sd, ed, sent in zip(starts.tolist(), ends.tolist(), sentences)
+        )
     # Ensure ordered
     chunks.sort(key=lambda x: (x['start'], x['end']))
     return chunks
 
 
+def _process_one_clip(
+    item: Tuple[str, float, List[Dict[str, Any]]],
+    vectorizer,
+    cfg: Tuple[float, float, int, str],
+) -> int:
+    """Merge one clip's sentence chunks and write its subtitle file; returns 1 if written."""
+    clip_path, s, chunks = item
+    sim_threshold, max_gap, min_chars, fmt = cfg
+    try:
+        # Merge semantically
+        chunks = _semantic_merge(chunks, sim_threshold, max_gap, min_chars, vectorizer)
+        # Filter very short items
+        chunks = [c for c in chunks if len((c['text'] or '').strip()) >= 1 and (c['end'] - c['start']) > 0.05]
+        if not chunks:
+            return 0
+        # Write SRT via contract generator
+        out_dir = os.path.dirname(clip_path) or "."
+        source_name = os.path.splitext(os.path.basename(clip_path))[0]
+        payload = {
+            "segments": [{"start": c["start"] - s, "end": c["end"] - s, "text": c["text"]} for c in chunks],
+            "format": fmt,
+            "out_dir": out_dir,
+            "source_name": source_name,
+            "time_offset_sec": 0.0,
+        }
+        result = generate_subtitle(payload)
+        return 1 if result.get("subtitle_path") else 0
+    except Exception:
+        # Skip errors for a single clip
+        return 0
+
+
 def generate_semantic_subtitles_for_clips(
     output_clips_dir: str,
     transcription_file: str,
@@ -166,7 +289,9 @@ def generate_semantic_subtitles_for_clips(
     fmt = (fmt or "srt").lower()
     if fmt not in ("srt", "ass"):
         fmt = "srt"
-    written = 0
+    # First pass: collect sentence chunks per clip so one TF-IDF vocabulary/IDF
+    # table can be fitted on all clips and shared instead of re-fitting per clip.
+    clip_chunks: List[Tuple[str, float, List[Dict[str, Any]]]] = []
     for clip_path in clip_paths:
         try:
             base = os.path.basename(clip_path)
@@ -174,28 +299,16 @@ def generate_semantic_subtitles_for_clips(
             if e <= s:
                 # fallback: no times -> skip
                 continue
-            # Collect sentence chunks
-            chunks = _build_sentence_chunks(segments, s, e)
-            # Merge semantically
-            chunks = _semantic_merge(chunks, sim_threshold, max_gap, min_chars)
-            # Filter very short items
-            chunks = [c for c in chunks if len((c['text'] or '').strip()) >= 1 and (c['end'] - c['start']) > 0.05]
-            if not chunks:
-                continue
-            # Write SRT via contract generator
-            out_dir = os.path.dirname(clip_path) or "."
-            source_name = os.path.splitext(os.path.basename(clip_path))[0]
-            payload = {
-                "segments": [{"start": c["start"] - s, "end": c["end"] - s, "text": c["text"]} for c in chunks],
-                "format": fmt,
-                "out_dir": out_dir,
-                "source_name": source_name,
-                "time_offset_sec": 0.0,
-            }
-            result = generate_subtitle(payload)
-            if result.get("subtitle_path"):
-                written += 1
+            clip_chunks.append((clip_path, s, _build_sentence_chunks(segments, s, e)))
         except Exception:
-            # Skip errors for a single clip
             continue
-    return written
+    # Only clips with at least _SHORT_TEXT_LIMIT sentences use the shared sklearn
+    # vectorizer; shorter ones compute their own TF-IDF and never touch it.
+    tfidf_texts = [c['text'] for _, _, chunks in clip_chunks if len(chunks) >= _SHORT_TEXT_LIMIT for c in chunks]
+    vectorizer = _fit_vectorizer(tfidf_texts) if tfidf_texts else None
+
+    cfg = (sim_threshold, max_gap, min_chars, fmt)
+    # Serial on purpose: per-clip work is a TF-IDF transform over a handful of
+    # sentences, far cheaper than spawning processes (which would also re-run the
+    # frozen GUI launcher on Windows) or contending for the GIL in threads.
+    return sum(_process_one_clip(item, vectorizer, cfg) for item in clip_chunks)
@@ -1,26 +1,191 @@
 # twitch_downloader.py - Twitch下载功能模块
 
+import asyncio
+import functools
+import hashlib
 import os
 import re
+import queue
+import random
 import requests
+import signal
 import subprocess
 import logging
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from PyQt5.QtCore import QThread, pyqtSignal, QSize
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from PyQt5.QtCore import QObject, QPoint, QRunnable, QThread, QThreadPool, QTimer, Qt, pyqtSignal, QSize
 from PyQt5.QtGui import QImage, QIcon, QPixmap
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QFormLayout, QLineEdit, QPushButton,
     QListWidget, QHBoxLayout, QLabel, QAbstractItemView, QGroupBox,
-    QProgressBar, QMessageBox, QFileDialog, QListWidgetItem
+    QProgressBar, QMessageBox, QFileDialog
 )
 
 from acfv.utils import safe_slug
 from acfv.utils.twitch_downloader_setup import ensure_cli_on_path
 from acfv.runtime.storage import processing_path, runs_out_path
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
 SCHEMA_VERSION = "1.0.0"
 
+# TwitchDownloaderCLI 进度行，例如 "[STATUS] - Downloading 42%" / "[STATUS] - Writing Output File"
+_STATUS_RE = re.compile(r'^\[STATUS\] -\s+(?P<stage>.+?)(?:\s+(?P<pct>\d{1,3})%)?\s*$')
+# CLI 阶段名 -> 界面显示名
+_STATUS_STAGE_MAP = {
+    'Downloading': '下载中',
+    'Downloading Embed Images': '下载嵌入图片',
+    'Embedding Images': '嵌入图片',
+    'Writing Output File': '写入文件'
+}
+# chatdownload 参数：完整模式嵌入全部表情；重试时去掉通常最慢的 7TV/FFZ；快速模式不嵌入图片
+_CHAT_ARGS_FULL = ["--embed-images", "--bttv=true", "--ffz=true", "--stv=true"]
+_CHAT_ARGS_RETRY = ["--embed-images", "--bttv=true", "--ffz=false", "--stv=false"]
+_CHAT_ARGS_FAST = []
+# 磁盘缩略图缓存有效期（回放封面基本不变，7 天后重新下载）
+_THUMB_CACHE_MAX_AGE = 7 * 24 * 3600
+# 文件名非法字符 -> '_'（str.translate 逐字符查表，比 re.sub 省去正则开销）
+_TITLE_TRANS = str.maketrans({c: '_' for c in '\\/:*?"<>|'})
+
+
+def _vod_timestamp(created_at: str) -> str:
+    """将 Twitch 的 ISO 时间 (2024-01-02T03:04:05Z) 转成文件名片段 2024-01-02_03-04-05"""
+    return created_at.replace(":", "-").replace("T", "_").rstrip("Z")
+
+
+def _event_loop_running() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _prune_thumb_cache(cache_dir):
+    """删除过期的磁盘缩略图缓存（文件按 URL 哈希命名，URL 不再出现时不会被覆盖）"""
+    cutoff = time.time() - _THUMB_CACHE_MAX_AGE
+    removed = 0
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+                except OSError:
+                    continue
+    except OSError:
+        return
+    if removed:
+        logging.info(f"已清理 {removed} 个过期缩略图缓存")
+
+
+def _pump_output(stream, q):
+    """后台读取子进程输出，逐行放入队列；结束时放入 None"""
+    try:
+        for line in iter(stream.readline, ''):
+            q.put(line)
+    finally:
+        q.put(None)
+
+
+def _iter_output_lines(process, poll_interval=0.2):
+    """逐行产出子进程输出；空闲 poll_interval 秒产出 ''，便于调用方及时检查取消。
+
+    Windows 管道不支持 select，因此用读取线程 + 队列代替 selectors。
+    """
+    q = queue.Queue()
+    threading.Thread(target=_pump_output, args=(process.stdout, q), daemon=True).start()
+    while True:
+        try:
+            line = q.get(timeout=poll_interval)
+        except queue.Empty:
+            yield ''
+            continue
+        if line is None:
+            return
+        yield line
+
+
+def _process_group_kwargs():
+    """让 CLI 及其子进程处于独立进程组，取消时可整组结束而不留下孤儿进程"""
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def _signal_process_group(process, force=False):
+    """向 CLI 进程组发送停止信号：默认温和停止（让 CLI 有机会收尾），force=True 时强制结束整组"""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == "nt":
+            if force:
+                subprocess.run(
+                    ["taskkill", "/T", "/F", "/PID", str(process.pid)],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+                )
+            else:
+                process.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except (OSError, ValueError) as e:
+        logging.debug(f"发送进程组信号失败，改为直接结束进程: {e}")
+        if force:
+            try:
+                process.kill()
+            except Exception:
+                pass
+
+
+def _terminate_process(process, grace=2.0):
+    """先温和停止，grace 秒内未退出再强制结束整个进程组"""
+    _signal_process_group(process)
+    try:
+        process.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        _signal_process_group(process, force=True)
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+
+
+def _build_http_session(pool_connections: int = 10, pool_maxsize: int = 20, max_retries=0) -> requests.Session:
+    """创建带连接池的 Session，复用 keep-alive 连接，避免每次请求重新 TCP/TLS 握手"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Twitch API 瞬时错误（限流 429 / 5xx / 连接中断）由 urllib3 在连接层指数退避重试，
+# 遵守 Retry-After；重试用尽后返回最后一次响应，由 raise_for_status() 照常报错
+_API_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["GET"]),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# 缩略图线程共享的连接池（static-cdn.jtvnw.net）：单一主机，连接数覆盖线程池并发上限；
+# 连接被 CDN 重置等瞬时错误时在连接层重试一次
+_THUMB_SESSION = _build_http_session(pool_connections=2, pool_maxsize=16, max_retries=Retry(total=1, backoff_factor=0.2))
+
 
 def _ensure_dir(path: str | os.PathLike) -> Path:
     p = Path(path)
@@ -142,62 +307,159 @@ class TwitchDownloader:
     
     def __init__(self, config_manager):
         self.config_manager = config_manager
-        self._current_process = None  # 跟踪当前运行的 CLI 进程
+        self._active_processes = set()  # 跟踪正在运行的 CLI 进程（视频与聊天可并行）
+        self._proc_lock = threading.Lock()
         self._cancel_requested = False
         self._detail_progress_cb = None  # 细粒度进度回调
+        self._chat_speed_mode = False  # 聊天记录快速模式（不嵌入表情图片）
         self._current_vod_context = None  # (idx, total, safe_filename)
+        # 视频下载进行中：并行的聊天记录下载不向单项进度条汇报，避免两路百分比来回跳动
+        self._video_downloading = threading.Event()
+        self._http = _build_http_session(max_retries=_API_RETRY)  # api.twitch.tv 连接复用
+        # 用户名 -> 用户ID 缓存（ID 不会变化），可持久化到配置中
+        self._user_id_cache = {}
+        if config_manager is not None:
+            try:
+                self._user_id_cache.update(config_manager.get("twitch_user_id_cache") or {})
+            except Exception:
+                pass
         # 延迟解析 CLI，避免 GUI 冷启动时同步联网升级/下载导致主线程卡死。
         self.cli_path = None
     
     def fetch_vods(self, client_id, oauth_token, usernames):
-        """获取指定用户的VOD列表"""
-        import time
-        
-        headers = {"Client-ID": client_id, "Authorization": f"Bearer {oauth_token}"}
+        """获取指定用户的VOD列表（各频道并行请求，结果按输入顺序合并）"""
         names = [u.strip() for u in usernames.split(",") if u.strip()]
         
         vods = []
+        for _name, user_vods, error in self.fetch_channel_vods(client_id, oauth_token, names):
+            if error is not None:
+                raise error
+            vods.extend(user_vods)
+        
+        logging.info(f"获取完成，共找到 {len(vods)} 个回放")
+        return vods
+    
+    def fetch_channel_vods(self, client_id, oauth_token, names):
+        """各频道并行获取回放，按输入顺序返回 [(频道名, 回放列表, 异常或 None)]，单个频道失败不影响其它频道"""
+        if not names:
+            return []
+        headers = {"Client-ID": client_id, "Authorization": f"Bearer {oauth_token}"}
+        
+        if AIOHTTP_AVAILABLE and not _event_loop_running():
+            # 单个事件循环 + 共享连接器并发请求所有频道
+            outcomes = asyncio.run(self._afetch_vods(headers, names))
+        else:
+            def fetch_one(name):
+                try:
+                    return self._fetch_user_vods(name, headers)
+                except Exception as exc:
+                    return exc
+            
+            with ThreadPoolExecutor(max_workers=min(8, len(names))) as ex:
+                outcomes = list(ex.map(fetch_one, names))
+        
+        return [
+            (name, [], outcome) if isinstance(outcome, BaseException) else (name, outcome, None)
+            for name, outcome in zip(names, outcomes)
+        ]
+    
+    async def _afetch_vods(self, headers, names):
+        """aiohttp 版本：所有频道共用一个 ClientSession，TLS 连接复用；异常按频道返回"""
+        connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=15)
+        async with aiohttp.ClientSession(headers=headers, connector=connector, timeout=timeout) as session:
+            return await asyncio.gather(
+                *(self._afetch_user_vods(session, name) for name in names),
+                return_exceptions=True,
+            )
+
+    async def _aget_json(self, session, url, params):
+        """aiohttp GET：429/5xx/连接错误按 _API_RETRY 的次数与退避重试（遵守 Retry-After）"""
+        attempts = _API_RETRY.total + 1
+        for attempt in range(attempts):
+            delay = _API_RETRY.backoff_factor * (2 ** attempt)
+            try:
+                async with session.get(url, params=params) as resp:
+                    if resp.status in _API_RETRY.status_forcelist and attempt + 1 < attempts:
+                        retry_after = resp.headers.get("Retry-After")
+                        if retry_after and retry_after.isdigit():
+                            delay = max(delay, float(retry_after))
+                        logging.info(f"Twitch API 返回 {resp.status}，{delay:.1f}s 后重试: {url}")
+                    else:
+                        resp.raise_for_status()
+                        return await resp.json()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt + 1 >= attempts:
+                    raise
+            await asyncio.sleep(delay)
+
+    async def _afetch_user_vods(self, session, username):
+        """aiohttp 版本的单频道回放获取：用户ID -> 回放"""
+        user_id = self._user_id_cache.get(username.lower())
+        if user_id is None:
+            logging.info(f"正在获取 {username} 的用户信息...")
+            user_data = (await self._aget_json(session, "https://api.twitch.tv/helix/users", {"login": username})).get("data", [])
+            
+            if not user_data:
+                raise Exception(f"用户不存在: {username}")
+            
+            user_id = self._remember_user_id(username, user_data[0]["id"])
         
-        for username in names:
+        logging.info(f"正在获取 {username} 的回放列表...")
+        params = {"user_id": user_id, "type": "archive", "first": "20"}
+        user_vods = (await self._aget_json(session, "https://api.twitch.tv/helix/videos", params)).get("data", [])
+        for vod in user_vods:
+            vod["channel"] = username
+        return user_vods
+    
+    def _remember_user_id(self, username, user_id):
+        """记录用户ID并同步到配置（由调用方的 save() 落盘）"""
+        self._user_id_cache[username.lower()] = user_id
+        if self.config_manager is not None:
+            try:
+                self.config_manager.set("twitch_user_id_cache", dict(self._user_id_cache))
+            except Exception:
+                pass
+        return user_id
+
+    def _fetch_user_vods(self, username, headers):
+        """获取单个频道的回放列表：用户ID -> 回放"""
+        user_id = self._user_id_cache.get(username.lower())
+        if user_id is None:
             logging.info(f"正在获取 {username} 的用户信息...")
             
             # 获取用户ID
-            r1 = requests.get(f"https://api.twitch.tv/helix/users?login={username}", headers=headers, timeout=10)
+            r1 = self._http.get(f"https://api.twitch.tv/helix/users?login={username}", headers=headers, timeout=10)
             r1.raise_for_status()
             user_data = r1.json().get("data", [])
             
             if not user_data:
                 raise Exception(f"用户不存在: {username}")
             
-            user_id = user_data[0]["id"]
-            
-            logging.info(f"正在获取 {username} 的回放列表...")
-            
-            # 获取VOD列表
-            r2 = requests.get(
-                f"https://api.twitch.tv/helix/videos?user_id={user_id}&type=archive&first=20",
-                headers=headers,
-                timeout=15
-            )
-            r2.raise_for_status()
-            
-            user_vods = r2.json().get("data", [])
-            for vod in user_vods:
-                vod["channel"] = username
-                vods.append(vod)
-                
-            # 小延迟避免API限制
-            time.sleep(0.1)
+            user_id = self._remember_user_id(username, user_data[0]["id"])
         
-        logging.info(f"获取完成，共找到 {len(vods)} 个回放")
-        return vods
+        logging.info(f"正在获取 {username} 的回放列表...")
+        
+        # 获取VOD列表
+        r2 = self._http.get(
+            f"https://api.twitch.tv/helix/videos?user_id={user_id}&type=archive&first=20",
+            headers=headers,
+            timeout=15
+        )
+        r2.raise_for_status()
+        
+        user_vods = r2.json().get("data", [])
+        for vod in user_vods:
+            vod["channel"] = username
+        return user_vods
     
-    def download_vods(self, vods, download_folder, progress_callback=None, stop_flag_callable=None, detail_progress_callback=None):
-        """下载指定的VOD列表（顺序执行，支持进度回调与停止）
+    def download_vods(self, vods, download_folder, progress_callback=None, stop_flag_callable=None, detail_progress_callback=None, speed_mode=None):
+        """下载指定的VOD列表（逐个VOD处理，视频与聊天记录并行下载，支持进度回调与停止）
 
         progress_callback: callable(current_index:int, total:int, safe_filename:str, stage:str)
             stage 取值示例: 'start', 'video_done', 'chat_done', 'item_done'
         stop_flag_callable: 返回 True 时提前停止
+        speed_mode: 为 True 时聊天记录不嵌入表情图片；None 表示读取配置 TWITCH_CHAT_SPEED_MODE
         """
         results = []
         total = len(vods)
@@ -209,9 +471,41 @@ class TwitchDownloader:
         except Exception as exc:
             logging.error(f"创建下载目录失败: {download_folder} ({exc})")
             return results
+
+        if speed_mode is None:
+            try:
+                speed_mode = bool(self.config_manager.get("TWITCH_CHAT_SPEED_MODE", False))
+            except Exception:
+                speed_mode = False
+        self._chat_speed_mode = bool(speed_mode)
+
+        # 聊天记录下载几乎不占带宽，放到后台线程与视频下载同时进行
+        chat_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="twitch-chat")
+        try:
+            return self._download_vod_items(vods, download_folder, results, total, progress_callback, stop_flag_callable, chat_pool)
+        finally:
+            chat_pool.shutdown(wait=True)
+
+    def _should_stop(self, external=None, abort=None):
+        """取消判定：下载器被取消、外部停止回调为真或 abort 事件已置位"""
+        return bool(
+            self._cancel_requested
+            or (external and external())
+            or (abort is not None and abort.is_set())
+        )
+
+    def _download_vod_items(self, vods, download_folder, results, total, progress_callback, stop_flag_callable, chat_pool):
+        """download_vods 的主循环：每个VOD的视频在当前线程下载，聊天记录同时在 chat_pool 中下载"""
+        should_stop = functools.partial(self._should_stop, stop_flag_callable)
+        # 一次目录扫描代替每个VOD两次 os.path.exists（normcase 保持 Windows 下大小写不敏感）
+        try:
+            with os.scandir(download_folder) as it:
+                existing = {os.path.normcase(entry.name) for entry in it}
+        except OSError:
+            existing = set()
         for idx, vod in enumerate(vods, start=1):
             # 外部请求停止
-            if (stop_flag_callable and stop_flag_callable()) or self._cancel_requested:
+            if should_stop():
                 logging.info("检测到停止/取消请求，终止后续下载")
                 if progress_callback:
                     try:
@@ -221,15 +515,16 @@ class TwitchDownloader:
                 break
             try:
                 # 清理文件名，避免重复
-                safe_title = re.sub(r'[\\/:\*\?"<>|]', '_', vod["title"])
-                timestamp = vod.get("created_at", "").replace(":", "-").replace("T", "_").rstrip("Z")
+                safe_title = vod["title"].translate(_TITLE_TRANS)
+                timestamp = _vod_timestamp(vod.get("created_at", ""))
                 safe_filename = f"{safe_title}_{timestamp}_{vod['id'][:8]}"
                 
                 video_path = os.path.join(download_folder, safe_filename + ".mp4")
                 chat_path = os.path.join(download_folder, safe_filename + "_chat.html")
                 
                 # 检查文件是否已存在
-                if os.path.exists(video_path) and os.path.exists(chat_path):
+                if (os.path.normcase(safe_filename + ".mp4") in existing
+                        and os.path.normcase(safe_filename + "_chat.html") in existing):
                     logging.info(f"文件已存在，跳过下载: {safe_filename}")
                     results.append((video_path, chat_path))
                     continue
@@ -244,14 +539,31 @@ class TwitchDownloader:
                 # 保存当前VOD上下文供子函数使用
                 self._current_vod_context = (idx, total, safe_filename)
 
-                # 下载视频（带重试机制）
-                video_success = self._download_with_retry(
-                    "videodownload", vod["id"], video_path, 
-                    f"视频 {safe_filename}",
-                    stop_flag_callable=lambda: (stop_flag_callable and stop_flag_callable()) or self._cancel_requested
+                # 视频失败时中止同一VOD的聊天记录下载
+                chat_abort = threading.Event()
+                chat_future = chat_pool.submit(
+                    self._download_with_retry,
+                    "chatdownload", vod["id"], chat_path,
+                    f"聊天记录 {safe_filename}",
+                    extra_args=_CHAT_ARGS_FAST if self._chat_speed_mode else _CHAT_ARGS_FULL,
+                    retry_extra_args=_CHAT_ARGS_FAST if self._chat_speed_mode else _CHAT_ARGS_RETRY,
+                    stop_flag_callable=functools.partial(self._should_stop, stop_flag_callable, chat_abort)
                 )
+
+                # 下载视频（带重试机制）
+                self._video_downloading.set()
+                try:
+                    video_success = self._download_with_retry(
+                        "videodownload", vod["id"], video_path, 
+                        f"视频 {safe_filename}",
+                        stop_flag_callable=should_stop
+                    )
+                finally:
+                    self._video_downloading.clear()
                 
                 if not video_success:
+                    chat_abort.set()
+                    chat_future.result()
                     logging.error(f"视频下载失败: {vod['id']}")
                     if progress_callback:
                         try:
@@ -266,13 +578,8 @@ class TwitchDownloader:
                     except Exception:
                         pass
 
-                # 下载聊天记录（带重试机制）
-                chat_success = self._download_with_retry(
-                    "chatdownload", vod["id"], chat_path, 
-                    f"聊天记录 {safe_filename}",
-                    extra_args=["--embed-images", "--bttv=true", "--ffz=true", "--stv=true"],
-                    stop_flag_callable=lambda: (stop_flag_callable and stop_flag_callable()) or self._cancel_requested
-                )
+                # 等待并行的聊天记录下载结束
+                chat_success = chat_future.result()
                 
                 if not chat_success:
                     logging.error(f"聊天记录下载失败: {vod['id']}")
@@ -289,10 +596,6 @@ class TwitchDownloader:
                     except Exception:
                         pass
                 
-                # 下载间隔，避免API限制
-                import time
-                time.sleep(1)
-                
             except Exception as e:
                 logging.error(f"下载VOD {vod.get('id', 'Unknown')} 时出错: {e}")
                 # 继续下载下一个，不中断整个流程
@@ -300,10 +603,31 @@ class TwitchDownloader:
         
         return results
     
-    def _download_with_retry(self, command_type, vod_id, output_path, description, max_retries=3, extra_args=None, stop_flag_callable=None):
-        """带重试机制的下载"""
+    def _retry_backoff(self, attempt, max_sleep, stop_flag_callable=None):
+        """指数退避 + 抖动等待（最多 max_sleep 秒），分片睡眠以便及时响应取消；
+        返回实际等待秒数，None 表示已取消"""
+        delay = min(30.0, 1.0 * (2 ** attempt)) * (0.5 + random.random())
+        delay = min(delay, max(0.0, max_sleep))
+        start = time.monotonic()
+        end = start + delay
+        while True:
+            if self._cancel_requested or (stop_flag_callable and stop_flag_callable()):
+                return None
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(0.2, remaining))
+        return time.monotonic() - start
+
+    def _download_with_retry(self, command_type, vod_id, output_path, description, max_retries=3, extra_args=None, stop_flag_callable=None, max_retry_seconds=120.0, retry_extra_args=None):
+        """带重试机制的下载（失败后指数退避重试，各次退避等待累计不超过 max_retry_seconds）
+
+        retry_extra_args: 第二次及以后尝试使用的参数（如去掉较慢的表情源），None 表示沿用 extra_args
+        """
         if extra_args is None:
             extra_args = []
+        # 只限制退避等待的总时长，下载本身耗时不计入：长时间下载后失败仍会重试
+        backoff_budget = max_retry_seconds
             
         for attempt in range(max_retries):
             try:
@@ -311,10 +635,13 @@ class TwitchDownloader:
                 if not cli_path or not os.path.exists(cli_path):
                     logging.error("TwitchDownloaderCLI 未找到，请检查 TWITCH_DOWNLOADER_PATH 或网络安装是否成功。")
                     return False
+                # 首次解析后记住路径，后续 VOD/重试不再走配置读取与版本检查
+                self.cli_path = cli_path
                 logging.info(f"{description} (尝试 {attempt + 1}/{max_retries})")
                 
                 # 构建命令
-                command = [cli_path, command_type, "--id", vod_id, "-o", output_path] + extra_args
+                args = retry_extra_args if attempt > 0 and retry_extra_args is not None else extra_args
+                command = [cli_path, command_type, "--id", vod_id, "-o", output_path] + list(args)
                 
                 # 使用Popen来实时处理输出，自动响应覆盖提示
                 process = subprocess.Popen(
@@ -324,37 +651,37 @@ class TwitchDownloader:
                     stderr=subprocess.STDOUT,
                     text=True,
                     bufsize=1,
-                    universal_newlines=True
+                    universal_newlines=True,
+                    **_process_group_kwargs()
                 )
-                self._current_process = process
+                with self._proc_lock:
+                    self._active_processes.add(process)
                 
-                # 实时读取输出并自动响应
-                while True:
+                # 实时读取输出并自动响应（无输出时每 0.2 秒也会检查一次取消）
+                for output in _iter_output_lines(process):
                     # 取消检查
                     if self._cancel_requested or (stop_flag_callable and stop_flag_callable()):
                         logging.info("收到取消信号，终止当前下载进程...")
                         try:
-                            process.kill()
+                            _terminate_process(process)
                         except Exception:
                             pass
-                        self._current_process = None
+                        self._forget_process(process)
                         return False
-                    output = process.stdout.readline()
-                    if output == '' and process.poll() is not None:
-                        break
                     if output:
-                        print(output.strip())  # 显示进度
+                        line = output.strip()
+                        logging.debug("%s", line)  # CLI 原始输出仅在调试级别记录，避免逐行 print
                         # 检测到覆盖提示时自动输入o
                         if "[O] Overwrite / [R] Rename / [E] Exit:" in output:
                             process.stdin.write("o\n")
                             process.stdin.flush()
                             logging.info("自动选择覆盖文件")
                         # 解析细粒度进度
-                        self._parse_and_emit_subprogress(output.strip(), command_type)
+                        self._parse_and_emit_subprogress(line, command_type)
                 
                 # 等待进程完成
                 return_code = process.wait()
-                self._current_process = None
+                self._forget_process(process)
                 
                 if return_code == 0:
                     logging.info(f"{description} 完成")
@@ -364,33 +691,46 @@ class TwitchDownloader:
                 
             except subprocess.TimeoutExpired:
                 logging.warning(f"{description} 超时 (尝试 {attempt + 1}/{max_retries})")
-                if attempt < max_retries - 1:
-                    time.sleep(5)  # 等待5秒后重试
-                continue
                 
             except subprocess.CalledProcessError as e:
                 logging.warning(f"{description} 失败 (尝试 {attempt + 1}/{max_retries}): {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(5)  # 等待5秒后重试
-                continue
+
+            except FileNotFoundError as e:
+                # CLI 可执行文件缺失等不可恢复错误，重试无意义
+                logging.error(f"{description} 无法启动 TwitchDownloaderCLI: {e}")
+                return False
                 
             except Exception as e:
                 logging.error(f"{description} 未知错误: {e}")
                 return False
+
+            # 超时或失败：退避后重试（最后一次失败直接结束）
+            if attempt < max_retries - 1:
+                waited = self._retry_backoff(attempt, backoff_budget, stop_flag_callable)
+                if waited is None:
+                    return False
+                backoff_budget -= waited
         
         return False
 
+    def _forget_process(self, process):
+        with self._proc_lock:
+            self._active_processes.discard(process)
+
     def cancel_current(self):
         """请求取消当前下载"""
         self._cancel_requested = True
-        proc = self._current_process
-        if proc and proc.poll() is None:
+        with self._proc_lock:
+            procs = list(self._active_processes)
+            self._active_processes.clear()
+        # 这里只发温和停止信号，不阻塞调用方（通常是 GUI 线程）；
+        # 下载线程在 0.2 秒内察觉取消后负责等待并在超时后强制结束进程组
+        for proc in procs:
             try:
                 logging.info("正在终止当前下载进程...")
-                proc.kill()
+                _signal_process_group(proc)
             except Exception as e:
                 logging.debug(f"终止进程时忽略错误: {e}")
-        self._current_process = None
         # 通知UI取消当前细粒度阶段
         if self._detail_progress_cb and self._current_vod_context:
             idx, total, safe_filename = self._current_vod_context
@@ -411,29 +751,19 @@ class TwitchDownloader:
         """
         if not self._detail_progress_cb or not self._current_vod_context:
             return
-        if not line.startswith('[STATUS] -'):
+        if not line.startswith('[STATUS]'):
+            return
+        # 视频与聊天并行下载时只显示视频进度，视频结束后再显示聊天的剩余进度
+        if command_type == 'chatdownload' and self._video_downloading.is_set():
+            return
+        m = _STATUS_RE.match(line)
+        if m is None:
             return
         try:
-            content = line[len('[STATUS] -'):].strip()
-            percent = None
-            stage_name = content
-            # 提取百分比
-            if content.endswith('%'):
-                # 从后往前找第一个空格再取数字
-                parts = content.rsplit(' ', 1)
-                if len(parts) == 2 and parts[1].endswith('%'):
-                    num = parts[1][:-1]
-                    if num.isdigit():
-                        percent = int(num)
-                        stage_name = parts[0]
+            pct = m['pct']
+            percent = int(pct) if pct is not None else None
             # 规范化阶段名称
-            mapping = {
-                'Downloading': '下载中',
-                'Downloading Embed Images': '下载嵌入图片',
-                'Embedding Images': '嵌入图片',
-                'Writing Output File': '写入文件'
-            }
-            stage_cn = mapping.get(stage_name, stage_name)
+            stage_cn = _STATUS_STAGE_MAP.get(m['stage'], m['stage'])
             idx, total, safe_filename = self._current_vod_context
             # 根据命令类型前置标签
             if command_type == 'videodownload' and stage_cn == '下载中':
@@ -482,16 +812,14 @@ class TwitchDownloader:
             stderr=subprocess.STDOUT,
             text=True,
             bufsize=1,
-            universal_newlines=True
+            universal_newlines=True,
+            **_process_group_kwargs()
         )
         
         # 实时读取输出并自动响应
-        while True:
-            output = process.stdout.readline()
-            if output == '' and process.poll() is not None:
-                break
+        for output in _iter_output_lines(process):
             if output:
-                print(output.strip())  # 显示进度
+                logging.debug("%s", output.strip())  # CLI 原始输出仅在调试级别记录
                 # 检测到覆盖提示时自动输入o
                 if "[O] Overwrite / [R] Rename / [E] Exit:" in output:
                     process.stdin.write("o\n")
@@ -505,17 +833,38 @@ class TwitchDownloader:
             raise subprocess.CalledProcessError(return_code, command)
 
 
-class Worker(QThread):
-    """通用工作线程"""
+class CancellableWorker(QThread):
+    """可停止工作线程的公共基类：统一 finished/error 信号与 stop() 接口，调用方无需 hasattr 探测"""
     finished = pyqtSignal(object)
     error = pyqtSignal(str)
+    stop_timeout_ms = 2000  # stop() 等待线程自然退出的时间
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._should_stop = False
+
+    def _request_stop(self):
+        """子类在此通知正在执行的任务尽快返回"""
+
+    def stop(self):
+        """停止线程：先协作式停止，超时后才 terminate()"""
+        self._should_stop = True
+        self._request_stop()
+        self.quit()
+        if not self.wait(self.stop_timeout_ms):
+            logging.warning(f"{type(self).__name__} 未能及时退出，强制终止")
+            self.terminate()
+            self.wait(1000)
+
+
+class Worker(CancellableWorker):
+    """通用工作线程"""
 
     def __init__(self, func, *args, **kwargs):
         super().__init__()
         self.func = func
         self.args = args
         self.kwargs = kwargs
-        self._should_stop = False
 
     def run(self):
         try:
@@ -531,37 +880,77 @@ class Worker(QThread):
         except Exception as e:
             if not self._should_stop:
                 self.error.emit(str(e))
-    
-    def stop(self):
-        """停止线程"""
-        self._should_stop = True
-        self.quit()
-        if not self.wait(2000):  # 等待2秒
-            self.terminate()
-            self.wait(1000)
 
 
-class ThumbnailDownloader(QThread):
-    """缩略图下载线程"""
-    loaded = pyqtSignal(int, object)  # QImage
+class ThumbnailSignals(QObject):
+    """缩略图任务的信号载体（QRunnable 不是 QObject，不能直接定义信号）"""
+    loaded = pyqtSignal(int, object)  # 已缩放到列表图标尺寸的 QImage
     failed = pyqtSignal(int, str)     # index, error
 
-    def __init__(self, index, template_url, parent=None):
-        super().__init__(parent)
+
+class ThumbnailDownloader(QRunnable):
+    """缩略图下载任务（在 QThreadPool 中运行）
+
+    不改用 GUI 线程上的 QNetworkAccessManager：磁盘缓存读取、JPEG 解码和缩放都在
+    本任务中完成，放回 GUI 线程会让大量缩略图同时到达时卡顿；线程池也提供了
+    按可见区域调整的优先级。
+    """
+
+    def __init__(self, index, template_url, signals, cache_path=None):
+        super().__init__()
         self.index = index
         self.template_url = template_url
+        self.signals = signals
+        self.cache_path = cache_path  # 可选：磁盘缓存文件路径
         self._should_stop = False
+        self.started = False  # 已被线程池取出执行（之后不可再调整优先级）
+        self.setAutoDelete(True)
+
+    def _load_cached(self):
+        """读取未过期的磁盘缓存，失败或过期返回 None"""
+        if self.cache_path is None:
+            return None
+        try:
+            if time.time() - self.cache_path.stat().st_mtime > _THUMB_CACHE_MAX_AGE:
+                return None
+        except OSError:
+            return None
+        image = QImage(str(self.cache_path))
+        return None if image.isNull() else self._to_icon_size(image)
+
+    @staticmethod
+    def _to_icon_size(image):
+        """在工作线程中缩放到列表图标尺寸，GUI 线程只需转换为 QPixmap"""
+        return image.scaled(160, 90, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    def _store_cache(self, data):
+        if self.cache_path is None:
+            return
+        tmp = self.cache_path.with_suffix(".part")
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(data)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            logging.debug(f"写入缩略图缓存失败: {e}")
 
     def run(self):
+        self.started = True
         try:
-            # 检查线程是否应该停止
+            # 检查任务是否应该停止
             if self._should_stop:
                 return
+
+            cached = self._load_cached()
+            if cached is not None:
+                if not self._should_stop:
+                    self.signals.loaded.emit(self.index, cached)
+                return
                 
             logging.info(f"正在下载缩略图 {self.index}: {self.template_url}")
             
             # 使用你提供的库的简单方法
-            response = requests.get(self.template_url, timeout=10)
+            response = _THUMB_SESSION.get(self.template_url, timeout=10)
             if self._should_stop:
                 return
                 
@@ -571,42 +960,37 @@ class ThumbnailDownloader(QThread):
                 image = QImage()
                 if image.loadFromData(response.content):
                     logging.info(f"缩略图 {self.index} 下载成功，图片尺寸: {image.width()}x{image.height()}")
+                    self._store_cache(response.content)
                     # 再次检查是否应该停止
                     if not self._should_stop:
-                        self.loaded.emit(self.index, image)
+                        self.signals.loaded.emit(self.index, self._to_icon_size(image))
                 else:
                     msg = f"数据加载失败"
                     logging.error(f"缩略图 {self.index} {msg}")
                     if not self._should_stop:
-                        self.failed.emit(self.index, msg)
+                        self.signals.failed.emit(self.index, msg)
             else:
                 msg = f"HTTP错误: {response.status_code}"
                 logging.error(f"缩略图 {self.index} {msg}")
                 if not self._should_stop:
-                    self.failed.emit(self.index, msg)
+                    self.signals.failed.emit(self.index, msg)
         except Exception as e:
             if not self._should_stop:
                 logging.error(f"缩略图下载失败: {e}")
                 try:
-                    self.failed.emit(self.index, str(e))
+                    self.signals.failed.emit(self.index, str(e))
                 except Exception:
                     pass
-    
 
-    
     def stop(self):
-        """停止线程"""
+        """请求停止（尚未开始的任务直接跳过，进行中的任务不再发出信号）"""
         self._should_stop = True
-        self.quit()
-        if not self.wait(1000):  # 缩略图线程等待时间短一些
-            self.terminate()
-            self.wait(500)
 
 
-class TwitchDownloadWorker(QThread):
+class TwitchDownloadWorker(CancellableWorker):
     """Twitch下载工作线程（支持进度）"""
-    finished = pyqtSignal(object)
-    error = pyqtSignal(str)
+    # 网络请求有超时、CLI 输出每 0.2 秒检查一次取消，正常情况下很快退出
+    stop_timeout_ms = 5000
     progress = pyqtSignal(int, int, str, str)  # current, total, filename, stage
     detail_progress = pyqtSignal(int, int, str, str, int)  # current, total, filename, sub_stage, percent
 
@@ -616,7 +1000,6 @@ class TwitchDownloadWorker(QThread):
         self.method = method
         self.args = args
         self.kwargs = kwargs
-        self._should_stop = False
 
     def _stop_flag(self):
         return self._should_stop
@@ -648,12 +1031,13 @@ class TwitchDownloadWorker(QThread):
             if not self._should_stop:
                 self.error.emit(str(e))
 
-    def stop(self):
-        self._should_stop = True
-        self.quit()
-        if not self.wait(2000):
-            self.terminate()
-            self.wait(1000)
+    def _request_stop(self):
+        """让下载器终止 CLI 进程，使 run() 自然返回"""
+        if self.method == 'download_vods':
+            try:
+                self.downloader.cancel_current()
+            except Exception as e:
+                logging.debug(f"取消下载时忽略错误: {e}")
 
 
 
@@ -668,7 +1052,26 @@ class TwitchTab:
         self.downloader = TwitchDownloader(config_manager)
         self.fetch_worker = None
         self.download_worker = None
-        self.thumbnail_threads = []
+        self.thumbnail_threads = []  # 当前批次的缩略图任务
+        self._thumb_pool = QThreadPool()
+        self._thumb_pool.setObjectName("twitch-thumbs")
+        # 空闲线程保留 5 分钟（默认 30 秒），重新获取列表时复用线程而不是重新创建
+        self._thumb_pool.setExpiryTimeout(5 * 60 * 1000)
+        self._thumb_signals = None
+        self._thumb_aliases = {}  # 首个 VOD 下标 -> 共用同一缩略图URL的其他 VOD 下标
+        self._thumb_cache_dir = processing_path("thumbnails") / "twitch"
+        # 过期缓存在后台清理，不阻塞界面启动
+        threading.Thread(target=_prune_thumb_cache, args=(self._thumb_cache_dir,), daemon=True).start()
+        # 已解码缩略图的内存 LRU：URL -> 缩放后的 QImage，重新获取列表时免去磁盘/网络与解码
+        self._thumb_cache = OrderedDict()
+        self._thumb_cache_max = 200
+        self._thumb_urls = {}  # 当前批次：VOD 下标 -> 缩略图URL
+        self._vod_rows = {}  # VOD 下标 -> 列表行号（无效 VOD 被跳过时两者不一致）
+        self._pending_icons = {}  # VOD 下标 -> 待批量设置的 QImage
+        self._notice_box = None  # 当前显示的非模态提示框
+        # 缩略图失败占位图只创建一次（QImage 隐式共享，复用不会复制像素）
+        self._placeholder_thumb = QImage(160, 90, QImage.Format_RGB32)
+        self._placeholder_thumb.fill(0xFF222222)
 
         self.vods = []
     
@@ -696,6 +1099,17 @@ class TwitchTab:
         self.list_vods = QListWidget()
         self.list_vods.setSelectionMode(QAbstractItemView.MultiSelection)
         self.list_vods.setIconSize(QSize(160, 90))  # 设置缩略图尺寸
+        # 滚动停止 100ms 后按可见区域重新排定排队中的缩略图任务
+        self._thumb_reprio_timer = QTimer(tab_widget)
+        self._thumb_reprio_timer.setSingleShot(True)
+        self._thumb_reprio_timer.setInterval(100)
+        self._thumb_reprio_timer.timeout.connect(self._reprioritize_thumbnails)
+        # 缩略图图标批量设置，50ms 合并一次
+        self._icon_flush_timer = QTimer(tab_widget)
+        self._icon_flush_timer.setSingleShot(True)
+        self._icon_flush_timer.setInterval(50)
+        self._icon_flush_timer.timeout.connect(self._flush_icons)
+        self.list_vods.verticalScrollBar().valueChanged.connect(self._schedule_thumb_reprioritize)
 
         layout.addWidget(self.list_vods)
 
@@ -724,6 +1138,17 @@ class TwitchTab:
         self.item_progress_bar.setVisible(False)
         self.item_progress_bar.setRange(0, 100)
         layout.addWidget(self.item_progress_bar)
+        # 细粒度进度最多 20 次/秒刷新，被节流的最后一次由定时器补发
+        self._last_item_progress = 0.0
+        self._pending_item_progress = None
+        # 上次写入控件的值，相同则跳过 setValue/setFormat/setText
+        self._last_bar_value = -1
+        self._last_bar_fmt = None
+        self._last_status_text = None
+        self._item_progress_timer = QTimer(tab_widget)
+        self._item_progress_timer.setSingleShot(True)
+        self._item_progress_timer.setInterval(50)
+        self._item_progress_timer.timeout.connect(self._flush_item_progress)
         self.download_status_label = QLabel("")
         self.download_status_label.setVisible(False)
         layout.addWidget(self.download_status_label)
@@ -741,7 +1166,10 @@ class TwitchTab:
     
     def fetch_vods(self):
         """获取VOD列表"""
+        # 旧批次缩略图对应的列表项即将被清空，立即停止它们
+        self._stop_thumbnail_tasks()
         self.list_vods.clear()
+        self._vod_rows = {}
         cid, tok, users = self.e_cid.text().strip(), self.e_tok.text().strip(), self.e_user.text().strip()
         
         if not cid or not tok or not users:
@@ -788,17 +1216,31 @@ class TwitchTab:
                     logging.warning(f"清空VOD列表失败: {e}")
                     return
                 
-                # 先添加所有VOD到列表
-                for vod in vods:
+                # 先添加所有VOD到列表（一次 addItems，暂停重绘与信号，避免逐项布局刷新）
+                labels = []
+                vod_indices = []  # 每行对应的 self.vods 下标（无效项被跳过时行号与下标不一致）
+                for vod_idx, vod in enumerate(vods):
                     try:
                         if isinstance(vod, dict) and all(key in vod for key in ['channel', 'title', 'created_at']):
-                            item = QListWidgetItem(f"[{vod['channel']}] {vod['title']} ({vod['created_at']})")
-                            self.list_vods.addItem(item)
+                            labels.append(f"[{vod['channel']}] {vod['title']} ({vod['created_at']})")
+                            vod_indices.append(vod_idx)
                     except Exception as e:
                         logging.warning(f"添加VOD项失败: {e}")
                         continue
+                self.list_vods.setUpdatesEnabled(False)
+                self.list_vods.blockSignals(True)
+                try:
+                    self.list_vods.addItems(labels)
+                    for row, vod_idx in enumerate(vod_indices):
+                        self.list_vods.item(row).setData(Qt.UserRole, vod_idx)
+                finally:
+                    self.list_vods.blockSignals(False)
+                    self.list_vods.setUpdatesEnabled(True)
+                # 反向映射：缩略图任务按 VOD 下标回调，设置图标时换算成行号
+                self._vod_rows = {vod_idx: row for row, vod_idx in enumerate(vod_indices)}
             else:
                 self.vods = []
+                self._vod_rows = {}
                 logging.warning("收到无效的VOD数据")
                 
         except Exception as e:
@@ -812,7 +1254,7 @@ class TwitchTab:
                 pass
         
         # 启动缩略图加载（支持禁用与并发限制）
-        self.thumbnail_threads = []
+        self._stop_thumbnail_tasks()
         try:
             disable_thumbs = bool(self.config_manager.get("DISABLE_TWITCH_THUMBNAILS", False))
         except Exception:
@@ -828,105 +1270,149 @@ class TwitchTab:
         except Exception:
             max_conc = 6
 
-        if not disable_thumbs:
-            active = 0
-            pending = []
-            # 准备任务队列
-            for idx, vod in enumerate(vods):
-                thumbnail_url = vod.get("thumbnail_url", "")
-                url = None
-                if thumbnail_url:
-                    if "{width}x{height}" in thumbnail_url:
-                        url = thumbnail_url.replace("{width}x{height}", "320x180")
-                    elif "%{width}x%{height}" in thumbnail_url:
-                        url = thumbnail_url.replace("%{width}x%{height}", "320x180")
-                    else:
-                        url = thumbnail_url
-                else:
-                    vod_id = vod.get("id", "")
-                    if vod_id:
-                        url = f"https://static-cdn.jtvnw.net/cf_vods/d2n2mtpsfdzgw0/{vod_id}/thumb/custom-{vod_id}-320x180.jpg"
-                if url:
-                    pending.append((idx, url))
-
-            # 启动受限并发
-            def _start_one(idx, url):
-                # 给缩略图下载线程设置正确的父对象，避免过早销毁
-                td = ThumbnailDownloader(idx, url, parent=self.main_window)
-                td.loaded.connect(self.on_thumb_loaded)
-                if hasattr(td, 'failed'):
-                    td.failed.connect(self.on_thumb_failed)
-                # 避免闭包捕获同名变量被覆盖，使用默认参数绑定当前 td
-                td.finished.connect(lambda td_ref=td: self._on_thumb_finished(td_ref))
-                self.thumbnail_threads.append(td)
-                td.start()
-
-            self._thumb_pending = pending  # 保存到实例，便于回调取用
-            self._thumb_active = 0
-            self._thumb_max = max(1, max_conc)
-
-            # 启动前 max_conc 个
-            while self._thumb_active < self._thumb_max and self._thumb_pending:
-                idx, url = self._thumb_pending.pop(0)
-                logging.info(f"开始下载缩略图 {idx}: {url}")
-                _start_one(idx, url)
-                self._thumb_active += 1
-        else:
-            logging.info("已禁用Twitch缩略图加载")
+        # 由线程池限制并发，排队任务由 QThreadPool 自行调度
+        self._thumb_pool.setMaxThreadCount(max(1, max_conc))
+        self._thumb_signals = ThumbnailSignals()
+        self._thumb_signals.loaded.connect(self._on_thumb_ready)
+        self._thumb_signals.failed.connect(self.on_thumb_failed)
+        # 相同URL只下载一次，结果同时应用到所有引用它的列表项
+        first_idx_for_url = {}
+        cached_hits = []  # 内存 LRU 命中的 (idx, image)，循环结束后一次性显示
+        for idx, vod in enumerate(vods or []):
+            row = self._vod_rows.get(idx)
+            if row is None:
+                continue  # 未加入列表的无效 VOD
+            thumbnail_url = vod.get("thumbnail_url", "")
+            url = None
+            if thumbnail_url:
+                # 直接请求列表图标尺寸（160x90），字节数约为 320x180 的四分之一；
+                # replace 对不存在的子串是空操作，无需先做 in 判断
+                url = thumbnail_url.replace("%{width}x%{height}", "160x90").replace("{width}x{height}", "160x90")
+            else:
+                vod_id = vod.get("id", "")
+                if vod_id:
+                    url = f"https://static-cdn.jtvnw.net/cf_vods/d2n2mtpsfdzgw0/{vod_id}/thumb/custom-{vod_id}-320x180.jpg"
+            if url:
+                if url in first_idx_for_url:
+                    self._thumb_aliases.setdefault(first_idx_for_url[url], []).append(idx)
+                    continue
+                first_idx_for_url[url] = idx
+                cached = self._thumb_cache.get(url)
+                if cached is not None:
+                    self._thumb_cache.move_to_end(url)
+                    cached_hits.append((idx, cached))
+                    continue
+                self._thumb_urls[idx] = url
+                # 磁盘缓存按 URL 哈希命名：Twitch 更新封面时 URL 随之变化，不会读到旧图
+                cache_path = self._thumb_cache_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.jpg"
+                task = ThumbnailDownloader(idx, url, self._thumb_signals, cache_path)
+                self.thumbnail_threads.append(task)
+                # 新列表从顶部开始显示，越靠前优先级越高
+                self._thumb_pool.start(task, -row)
+        if cached_hits:
+            # 延到下一轮事件循环，先让列表完成绘制（别名索引此时才收集完整）
+            QTimer.singleShot(0, functools.partial(self._apply_cached_thumbs, cached_hits))
+
+    def _apply_cached_thumbs(self, hits):
+        for idx, img in hits:
+            self.on_thumb_loaded(idx, img)
+
+    def _schedule_thumb_reprioritize(self, _value=None):
+        """滚动时重启防抖定时器（不能直接连 QTimer.start：int 参数会被当作 start(msec)）"""
+        self._thumb_reprio_timer.start()
+
+    def _stop_thumbnail_tasks(self):
+        """停止上一批缩略图任务：丢弃排队任务，进行中的任务不再回调"""
+        for task in self.thumbnail_threads:
+            task.stop()
+        self.thumbnail_threads = []
+        # 断开旧批次信号，已排入事件队列但尚未处理的回调也随之丢弃
+        if self._thumb_signals is not None:
+            try:
+                self._thumb_signals.loaded.disconnect()
+                self._thumb_signals.failed.disconnect()
+            except (TypeError, RuntimeError):
+                pass
+            self._thumb_signals = None
+        self._thumb_aliases = {}
+        self._thumb_urls = {}
+        self._pending_icons = {}  # 旧列表的待设置图标一并丢弃
+        try:
+            self._thumb_pool.clear()
+        except Exception:
+            pass
+
+    def _visible_rows(self):
+        """当前视口内的首尾行号"""
+        viewport = self.list_vods.viewport()
+        first = self.list_vods.indexAt(QPoint(0, 0)).row()
+        last = self.list_vods.indexAt(QPoint(0, viewport.height() - 1)).row()
+        if first < 0:
+            first = 0
+        if last < 0:
+            last = self.list_vods.count() - 1
+        return first, last
+
+    def _reprioritize_thumbnails(self):
+        """把排队中的缩略图任务按与可见区域的距离重新入队：可见行最先，其次上下相邻的行"""
+        first, last = self._visible_rows()
+        for task in self.thumbnail_threads:
+            if task.started or task._should_stop:
+                continue
+            row = self._vod_rows.get(task.index, task.index)
+            distance = first - row if row < first else max(0, row - last)
+            try:
+                if self._thumb_pool.tryTake(task):
+                    self._thumb_pool.start(task, -distance)
+            except (RuntimeError, AttributeError):
+                continue
+
+    def _on_thumb_ready(self, idx, img):
+        """缩略图任务成功：写入内存 LRU 后显示"""
+        url = self._thumb_urls.pop(idx, None)
+        if url is not None:
+            self._thumb_cache[url] = img
+            self._thumb_cache.move_to_end(url)
+            while len(self._thumb_cache) > self._thumb_cache_max:
+                self._thumb_cache.popitem(last=False)
+        self.on_thumb_loaded(idx, img)
+
     def on_fetch_error(self, msg):
         """VOD获取错误"""
         self.main_window.update_status("获取回放列表失败")
         QMessageBox.warning(self.main_window, "错误", msg)
 
     def on_thumb_loaded(self, idx, img):
-        """缩略图加载完成"""
-        from PyQt5.QtCore import Qt
-        
-        logging.info(f"缩略图 {idx} 加载完成，原始图片尺寸: {img.width()}x{img.height()}")
-        pix = QPixmap.fromImage(img).scaled(160, 90, Qt.KeepAspectRatio | Qt.SmoothTransformation)
-        logging.info(f"缩略图 {idx} 缩放后尺寸: {pix.width()}x{pix.height()}")
-        
-        item = self.list_vods.item(idx)
-        if item:
-            item.setIcon(QIcon(pix))
-            logging.info(f"缩略图 {idx} 已设置到列表项")
-            # 强制刷新列表项显示
-            self.list_vods.update()
-        else:
-            logging.warning(f"找不到列表项 {idx} 来设置缩略图")
-            logging.warning(f"当前列表项数量: {self.list_vods.count()}")
-
-    def _on_thumb_finished(self, worker):
-        """单个缩略图线程完成后的调度（限制并发）"""
-        try:
-            if hasattr(worker, 'deleteLater'):
-                worker.deleteLater()
-        except Exception:
-            pass
+        """缩略图加载完成：先登记，50ms 内到达的缩略图合并为一次列表刷新"""
+        logging.debug(f"缩略图 {idx} 加载完成，尺寸: {img.width()}x{img.height()}")
+        self._pending_icons[idx] = img
+        if not self._icon_flush_timer.isActive():
+            self._icon_flush_timer.start()
+
+    def _flush_icons(self):
+        """把积攒的缩略图一次性设置到列表项"""
+        pending, self._pending_icons = self._pending_icons, {}
+        if not pending:
+            return
+        self.list_vods.setUpdatesEnabled(False)
         try:
-            self._thumb_active = max(0, getattr(self, '_thumb_active', 1) - 1)
-            # 继续启动队列中的下一个
-            if getattr(self, '_thumb_pending', None) and self._thumb_active < getattr(self, '_thumb_max', 1):
-                idx, url = self._thumb_pending.pop(0)
-                logging.info(f"开始下载缩略图 {idx}: {url}")
-                td = ThumbnailDownloader(idx, url, parent=self.main_window)
-                td.loaded.connect(self.on_thumb_loaded)
-                if hasattr(td, 'failed'):
-                    td.failed.connect(self.on_thumb_failed)
-                td.finished.connect(lambda td_ref=td: self._on_thumb_finished(td_ref))
-                self.thumbnail_threads.append(td)
-                td.start()
-                self._thumb_active += 1
-        except Exception as e:
-            logging.debug(f"缩略图并发调度异常: {e}")
+            for idx, img in pending.items():
+                # 图片已在工作线程中缩放，这里只做一次 QImage -> QPixmap 转换
+                icon = QIcon(QPixmap.fromImage(img))
+                for i in [idx] + self._thumb_aliases.get(idx, []):
+                    row = self._vod_rows.get(i)
+                    item = self.list_vods.item(row) if row is not None else None
+                    if item:
+                        item.setIcon(icon)
+                    else:
+                        logging.warning(f"找不到列表项 {i} 来设置缩略图（当前列表项数量: {self.list_vods.count()}）")
+        finally:
+            self.list_vods.setUpdatesEnabled(True)
 
     def on_thumb_failed(self, idx, err):
-        """缩略图失败时也推进并发队列，并用占位图避免卡住UI"""
+        """缩略图失败时用占位图，避免列表项一直空白"""
         try:
-            from PyQt5.QtGui import QImage
-            img = QImage(160, 90, QImage.Format_RGB32)
-            img.fill(0xFF222222)
-            self.on_thumb_loaded(idx, img)
+            self.on_thumb_loaded(idx, self._placeholder_thumb)
         except Exception:
             pass
 
@@ -959,11 +1445,8 @@ class TwitchTab:
             QMessageBox.warning(self.main_window, "错误", "下载目录无效")
             return
 
-        # 获取选中的VOD
-        selected_vods = []
-        for item in items:
-            idx = self.list_vods.row(item)
-            selected_vods.append(self.vods[idx])
+        # 获取选中的VOD（下标在填充列表时存入 UserRole，避免逐项 row() 线性查找）
+        selected_vods = [self.vods[item.data(Qt.UserRole)] for item in items]
         
         # 显示下载确认对话框
         count = len(selected_vods)
@@ -984,11 +1467,10 @@ class TwitchTab:
         self.download_progress_bar.setRange(0, self._current_total)
         self.download_progress_bar.setValue(0)
         self.download_progress_bar.setVisible(True)
-        self.download_status_label.setText("准备开始下载...")
+        self._set_status_text("准备开始下载...")
         self.download_status_label.setVisible(True)
         self.item_progress_bar.setVisible(True)
-        self.item_progress_bar.setValue(0)
-        self.item_progress_bar.setFormat("-")
+        self._set_item_bar(0, "-")
         self.cancel_button.setVisible(True)
         self.btn_download.setEnabled(False)
         self.list_vods.setEnabled(False)
@@ -1001,8 +1483,7 @@ class TwitchTab:
         )
         self.download_worker.progress.connect(self.update_download_progress)
         # 细粒度进度
-        if hasattr(self.download_worker, 'detail_progress'):
-            self.download_worker.detail_progress.connect(self.update_item_detail_progress)
+        self.download_worker.detail_progress.connect(self.update_item_detail_progress)
         self.download_worker.finished.connect(self.on_download_done)
         self.download_worker.error.connect(self.on_download_error)
         self.download_worker.start()
@@ -1033,7 +1514,7 @@ class TwitchTab:
             'canceled': '已取消'
         }
         stage_cn = stage_map.get(stage, stage)
-        self.download_status_label.setText(
+        self._set_status_text(
             f"{stage_cn}: {filename}  ({min(self._completed_items, total)}/{total})"
         )
 
@@ -1068,15 +1549,31 @@ class TwitchTab:
         self.item_progress_bar.setVisible(False)
         self._is_downloading = False
         if canceled:
-            self.download_status_label.setText("下载已取消")
+            self._set_status_text("下载已取消")
 
     def on_download_done(self, results):
-        """下载完成 - 线程安全版本"""
+        """下载完成 - 线程安全版本
+
+        槽函数只恢复界面；保存配置、刷新列表和提示框推迟到下一轮事件循环，
+        让工作线程的 run() 先返回并结束。
+        """
+        # 恢复UI
+        if self._is_downloading:
+            self.finish_download_ui()
+            self._set_status_text("全部下载完成")
+        QTimer.singleShot(0, functools.partial(self._finalize_download, results))
+
+    def _finalize_download(self, results):
+        """下载完成后的收尾工作（配置保存、刷新本地视频、完成提示）"""
+        # 线程已结束则交给 Qt 释放
+        worker = self.download_worker
+        try:
+            if worker is not None and worker.isFinished():
+                worker.deleteLater()
+                self.download_worker = None
+        except RuntimeError:
+            self.download_worker = None
         try:
-            # 恢复UI
-            if self._is_downloading:
-                self.finish_download_ui()
-                self.download_status_label.setText("全部下载完成")
             # 检查主窗口是否仍然有效
             if not self.main_window or getattr(self.main_window, 'is_shutting_down', False):
                 logging.info("主窗口已关闭，跳过下载完成处理")
@@ -1105,8 +1602,8 @@ class TwitchTab:
                     
                     # 安全地显示完成消息
                     try:
-                        QMessageBox.information(
-                            self.main_window, "完成", 
+                        self._show_notice(
+                            QMessageBox.Information, "完成",
                             f"下载完成\n视频: {last_video}\n聊天: {last_chat}"
                         )
                     except Exception as e:
@@ -1114,9 +1611,9 @@ class TwitchTab:
                         
                 except (ValueError, IndexError, TypeError) as e:
                     logging.error(f"处理下载结果时出错: {e}")
-                    QMessageBox.information(self.main_window, "完成", "下载完成，但处理结果时出现问题")
+                    self._show_notice(QMessageBox.Information, "完成", "下载完成，但处理结果时出现问题")
             else:
-                QMessageBox.information(self.main_window, "完成", "下载完成")
+                self._show_notice(QMessageBox.Information, "完成", "下载完成")
                 
         except Exception as e:
             logging.error(f"下载完成处理异常: {e}")
@@ -1129,6 +1626,14 @@ class TwitchTab:
 
 
 
+    def _show_notice(self, icon, title, text):
+        """非模态提示框：不阻塞事件循环，工作线程的收尾信号可继续处理"""
+        box = QMessageBox(icon, title, text, QMessageBox.Ok, self.main_window)
+        box.setModal(False)
+        box.setAttribute(Qt.WA_DeleteOnClose)
+        box.show()
+        self._notice_box = box  # 保留引用，避免被 Python 回收
+
     def on_download_error(self, msg):
         """下载错误 - 线程安全版本"""
         try:
@@ -1143,7 +1648,7 @@ class TwitchTab:
             
             # 安全地显示错误消息
             try:
-                QMessageBox.warning(self.main_window, "错误", str(msg) if msg else "下载过程中发生未知错误")
+                self._show_notice(QMessageBox.Warning, "错误", str(msg) if msg else "下载过程中发生未知错误")
             except Exception as e:
                 logging.error(f"显示错误消息失败: {e}")
                 
@@ -1155,49 +1660,19 @@ class TwitchTab:
 
     def cleanup(self):
         """清理资源"""
-        workers_to_cleanup = [
-            ('fetch_worker', self.fetch_worker),
-            ('download_worker', self.download_worker)
-        ]
-        
-        # 清理主要的工作线程
-        for name, worker in workers_to_cleanup:
+        # 两个工作线程都是 TwitchDownloadWorker，stop() 会协作式结束线程
+        for name, worker in (('fetch_worker', self.fetch_worker), ('download_worker', self.download_worker)):
             try:
-                if (worker and 
-                    hasattr(worker, 'isRunning') and 
-                    worker.isRunning()):
+                if worker is not None and worker.isRunning():
                     logging.info(f"正在停止{name}...")
-                    if hasattr(worker, 'stop'):
-                        worker.stop()
-                    else:
-                        worker.quit()
-                        if not worker.wait(2000):  # 等待2秒
-                            worker.terminate()
-                            worker.wait(1000)
-            except (RuntimeError, AttributeError) as e:
-                # 对象可能已经被删除，忽略错误
+                    worker.stop()
+            except RuntimeError as e:
+                # 对象可能已经被 Qt 删除，忽略错误
                 logging.debug(f"清理{name}时忽略错误: {e}")
-        
-        # 清理缩略图下载线程
-        try:
-            if hasattr(self, 'thumbnail_threads'):
-                for i, worker in enumerate(self.thumbnail_threads):
-                    try:
-                        if (worker and 
-                            hasattr(worker, 'isRunning') and 
-                            worker.isRunning()):
-                            logging.info(f"正在停止缩略图线程 {i+1}...")
-                            if hasattr(worker, 'stop'):
-                                worker.stop()
-                            else:
-                                worker.quit()
-                                if not worker.wait(1000):  # 缩略图线程等待时间短一些
-                                    worker.terminate()
-                                    worker.wait(500)
-                    except (RuntimeError, AttributeError) as e:
-                        logging.debug(f"清理缩略图线程 {i+1} 时忽略错误: {e}")
-        except (RuntimeError, AttributeError) as e:
-            logging.debug(f"清理缩略图线程列表时忽略错误: {e}")
+
+        # 缩略图：丢弃排队任务、进行中的任务不再回调，再短暂等待正在下载的任务
+        self._stop_thumbnail_tasks()
+        self._thumb_pool.waitForDone(500)
 
     def cancel_download(self):
         """用户点击取消下载"""
@@ -1221,14 +1696,44 @@ class TwitchTab:
         # 只有在下载中才更新
         if not self._is_downloading:
             return
+        # 距上次刷新不足 50ms 时只记下最新值，100% 总是立即显示
+        if percent < 100 and time.monotonic() - self._last_item_progress < 0.05:
+            self._pending_item_progress = (sub_stage, percent)
+            if not self._item_progress_timer.isActive():
+                self._item_progress_timer.start()
+            return
+        self._pending_item_progress = None
+        self._apply_item_progress(sub_stage, percent)
+
+    def _flush_item_progress(self):
+        """补发节流期间最后一次细粒度进度"""
+        pending, self._pending_item_progress = self._pending_item_progress, None
+        if pending and self._is_downloading:
+            self._apply_item_progress(*pending)
+
+    def _apply_item_progress(self, sub_stage, percent):
+        self._last_item_progress = time.monotonic()
         # 若切换到新的文件且 percent 很小，重置条
         try:
             self.item_progress_bar.setVisible(True)
-            self.item_progress_bar.setValue(int(percent))
             # 设置显示文本：阶段 + 百分比
-            self.item_progress_bar.setFormat(f"{sub_stage} {percent}%")
+            self._set_item_bar(int(percent), f"{sub_stage} {percent}%")
         except Exception:
             pass
+
+    def _set_item_bar(self, value, fmt):
+        """仅在数值/文本实际变化时更新单项进度条，避免无意义的重绘"""
+        if value != self._last_bar_value:
+            self.item_progress_bar.setValue(value)
+            self._last_bar_value = value
+        if fmt != self._last_bar_fmt:
+            self.item_progress_bar.setFormat(fmt)
+            self._last_bar_fmt = fmt
+
+    def _set_status_text(self, text):
+        if text != self._last_status_text:
+            self.download_status_label.setText(text)
+            self._last_status_text = text
         
 
         
@@ -1249,6 +1754,8 @@ class TwitchDownloadPage(QWidget):
         
         self.vods = []
         self.worker = None
+        self.fetch_worker = None
+        self._downloader = TwitchDownloader(None)  # 回放列表获取复用下载器的连接池、重试与用户ID缓存
         self.video_output_path = ""
         self.chat_output_path = ""
         self.init_ui()
@@ -1313,34 +1820,33 @@ class TwitchDownloadPage(QWidget):
             QMessageBox.warning(self, "错误", "请填写完整的 Twitch 设置")
             return
 
-        headers = {"Client-ID": client_id, "Authorization": f"Bearer {oauth_token}"}
-        for username in usernames:
-            try:
-                resp = requests.get(f"https://api.twitch.tv/helix/users?login={username}", headers=headers)
-                resp.raise_for_status()
-                data = resp.json().get("data", [])
-                if not data:
-                    QMessageBox.warning(self, "错误", f"无法获取用户信息: {username}")
-                    continue
-                user_id = data[0]["id"]
-            except Exception as e:
-                QMessageBox.warning(self, "错误", f"获取用户信息失败 ({username}): {e}")
+        # 网络请求放到工作线程，避免阻塞界面
+        self.btn_fetch.setEnabled(False)
+        self.fetch_worker = Worker(self._downloader.fetch_channel_vods, client_id, oauth_token, usernames)
+        self.fetch_worker.finished.connect(self.on_fetch_finished)
+        self.fetch_worker.error.connect(self.on_fetch_error)
+        self.fetch_worker.start()
+
+    def on_fetch_finished(self, results):
+        """回放列表获取完成（主线程）"""
+        self.btn_fetch.setEnabled(True)
+        labels = []
+        for username, vods_channel, error in results:
+            if error is not None:
+                QMessageBox.warning(self, "错误", f"获取回放列表失败 ({username}): {error}")
                 continue
+            for vod in vods_channel:
+                self.vods.append(vod)
+                labels.append(f"[{username}] {vod['title']} ({vod['created_at']})")
+        self.list_vods.setUpdatesEnabled(False)
+        try:
+            self.list_vods.addItems(labels)
+        finally:
+            self.list_vods.setUpdatesEnabled(True)
 
-            try:
-                vod_resp = requests.get(
-                    f"https://api.twitch.tv/helix/videos?user_id={user_id}&type=archive&first=20",
-                    headers=headers
-                )
-                vod_resp.raise_for_status()
-                vods_channel = vod_resp.json().get("data", [])
-                for vod in vods_channel:
-                    vod["channel"] = username
-                    self.vods.append(vod)
-                    item_text = f"[{username}] {vod['title']} ({vod['created_at']})"
-                    self.list_vods.addItem(item_text)
-            except Exception as e:
-                QMessageBox.warning(self, "错误", f"获取回放列表失败 ({username}): {e}")
+    def on_fetch_error(self, error):
+        self.btn_fetch.setEnabled(True)
+        QMessageBox.warning(self, "错误", f"获取回放列表失败: {error}")
 
     def download_selected_vod(self):
         """下载选中的VOD（兼容原有接口）"""
@@ -1363,7 +1869,7 @@ class TwitchDownloadPage(QWidget):
         raw_time = vod.get("created_at", "")
         safe_channel = sanitize_filename(raw_channel)
         safe_title = sanitize_filename(raw_title)
-        safe_time = sanitize_filename(raw_time.replace("T", "_").replace(":", "-").rstrip("Z"))
+        safe_time = sanitize_filename(_vod_timestamp(raw_time))
         base_name = f"{safe_channel}_{safe_title}_{safe_time}"
 
         self.progress_bar.setVisible(True)
@@ -5,8 +5,14 @@ import json
 import numpy as np
 import subprocess
 import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from sklearn.cluster import DBSCAN
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.signal import lfilter
 
 # 尝试导入YOLO，如果失败则提供fallback
 try:
@@ -16,6 +22,128 @@ except ImportError:
     # 将print语句移到函数内部，避免在导入时执行
     YOLO_AVAILABLE = False
 
+# 采样帧间距超过该秒数时才重新 seek，否则顺序 grab 前进（seek 需从关键帧重新解码整个 GOP）
+_SEEK_GRAB_LIMIT_SEC = 2.0
+# 每次YOLO推理的最大帧数
+_YOLO_BATCH_SIZE = 16
+# 分段采样帧的并行解码线程数
+_DECODE_WORKERS = 4
+
+
+def _iter_sampled_frames(cap, frame_numbers, fps):
+    """
+    按非递减帧号顺序解码采样帧
+
+    只在首帧或跨度较大时 seek 一次，其余帧用 cap.grab() 跳过（不做颜色转换），
+    仅在采样帧上 retrieve；读取失败时停止。
+    """
+    max_grab = int(_SEEK_GRAB_LIMIT_SEC * fps) if fps > 0 else 0
+    pos = None
+    frame = None
+    for frame_number in frame_numbers:
+        if pos is not None and frame_number < pos:
+            # 同一帧被重复采样（采样间隔小于帧间隔）
+            yield frame
+            continue
+        if pos is None or frame_number - pos > max_grab:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            pos = frame_number
+        while pos < frame_number:
+            if not cap.grab():
+                return
+            pos += 1
+        ret, frame = cap.read()
+        if not ret:
+            return
+        pos += 1
+        yield frame
+
+
+# GPU 编码器（解码同时启用硬件加速），不可用或失败时回退到 CPU 编码
+_HW_VIDEO_ENCODERS = (
+    ('h264_nvenc', ['-preset', 'p4', '-cq', '23']),
+)
+_CPU_VIDEO_ENCODER = ('libx264', ['-preset', 'veryfast', '-crf', '23'])
+
+
+@lru_cache(maxsize=1)
+def _video_encoder_candidates():
+    """按优先级返回可尝试的 (编码器, 参数)；只有 ffmpeg 编译了 NVENC 时才先尝试 GPU"""
+    try:
+        listing = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-encoders'],
+            capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        listing = ""
+    candidates = [enc for enc in _HW_VIDEO_ENCODERS if f" {enc[0]} " in listing]
+    candidates.append(_CPU_VIDEO_ENCODER)
+    return tuple(candidates)
+
+
+@lru_cache(maxsize=8)
+def _probe_video_info(video_path, mtime_ns):
+    """打开一次视频读取基本信息；mtime 参与缓存键，文件被替换后会重新读取"""
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    duration = total_frames / fps if fps > 0 else 0
+    cap.release()
+    
+    return {
+        'fps': fps,
+        'total_frames': total_frames,
+        'width': width,
+        'height': height,
+        'duration': duration
+    }
+
+
+def _largest_box(xyxy, conf, threshold):
+    """返回置信度达标且面积最大的检测框 [x1, y1, x2, y2]；没有正面积的框时返回 None"""
+    if len(xyxy) == 0:
+        return None
+    coords = xyxy[:, :4].astype(np.int64)
+    areas = (coords[:, 2] - coords[:, 0]) * (coords[:, 3] - coords[:, 1])
+    areas[conf < threshold] = 0
+    idx = int(np.argmax(areas))
+    if areas[idx] <= 0:
+        return None
+    return coords[idx].tolist()
+
+
+def _radius_cluster_labels(points, eps, min_samples):
+    """
+    DBSCAN 等价的半径图聚类，噪声点标记为 -1
+
+    点数很少（每段几十个中心点），直接算两两距离矩阵，再对核心点求连通分量；
+    簇编号与边界点归属与 sklearn DBSCAN 的扫描顺序一致。
+    """
+    diff = points[:, None, :] - points[None, :, :]
+    adj = np.hypot(diff[..., 0], diff[..., 1]) <= eps
+    labels = np.full(len(points), -1, dtype=np.int64)
+    core_idx = np.flatnonzero(adj.sum(axis=1) >= min_samples)
+    if core_idx.size == 0:
+        return labels
+
+    n_clusters, comp = connected_components(csr_matrix(adj[np.ix_(core_idx, core_idx)]), directed=False)
+    # 按每个簇中最小的核心点下标重新编号
+    first = np.full(n_clusters, len(points))
+    np.minimum.at(first, comp, core_idx)
+    rank = np.empty(n_clusters, dtype=np.int64)
+    rank[np.argsort(first)] = np.arange(n_clusters)
+    labels[core_idx] = rank[comp]
+
+    # 边界点归入相邻簇中编号最小的一个
+    border = np.setdiff1d(np.flatnonzero(adj[:, core_idx].any(axis=1)), core_idx)
+    if border.size:
+        near = adj[np.ix_(border, core_idx)]
+        labels[border] = np.where(near, labels[core_idx][None, :], n_clusters).min(axis=1)
+    return labels
+
+
 class SegmentedYOLOProcessor:
     def __init__(self, yolo_weights="best.pt", segment_length=4.0, confidence_threshold=0.5):
         """
@@ -53,22 +181,12 @@ class SegmentedYOLOProcessor:
             self.yolo_available = False
 
     def get_video_info(self, video_path):
-        """获取视频基本信息"""
-        cap = cv2.VideoCapture(video_path)
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        duration = total_frames / fps if fps > 0 else 0
-        cap.release()
-        
-        return {
-            'fps': fps,
-            'total_frames': total_frames,
-            'width': width,
-            'height': height,
-            'duration': duration
-        }
+        """获取视频基本信息（按路径和修改时间缓存）"""
+        try:
+            mtime_ns = os.stat(video_path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        return dict(_probe_video_info(video_path, mtime_ns))
 
     def detect_segment_boxes(self, video_path, start_time, end_time, sample_interval=0.5):
         """
@@ -82,51 +200,55 @@ class SegmentedYOLOProcessor:
         """
         if not self.yolo_available or self.yolo_model is None:
             return []
-            
-        cap = cv2.VideoCapture(video_path)
+        
+        samples, frames = self.sample_segment_frames(video_path, start_time, end_time, sample_interval)
+        return self.detect_frame_boxes(samples, frames)
+
+    def sample_segment_frames(self, video_path, start_time, end_time, sample_interval=0.5, cap=None):
+        """
+        解码指定时间段内的采样帧（只做解码，可在线程中并行）
+        
+        Args:
+            cap: 可复用的已打开 VideoCapture；为空时临时打开并在结束后释放
+        
+        Returns:
+            (samples, frames)：samples 为 [(时间, 帧号)]，frames 为成功解码的帧
+        """
+        own_cap = cap is None
+        if own_cap:
+            cap = cv2.VideoCapture(video_path)
         fps = cap.get(cv2.CAP_PROP_FPS)
         
-        boxes = []
+        # 采样帧号与时间点（与原先逐次 seek 的取帧位置一致）
+        samples = []
         current_time = start_time
-        
         while current_time < end_time:
-            frame_number = int(current_time * fps)
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
+            samples.append((current_time, int(current_time * fps)))
+            current_time += sample_interval
+        
+        frame_numbers = [frame_number for _, frame_number in samples]
+        frames = list(_iter_sampled_frames(cap, frame_numbers, fps))
+        if own_cap:
+            cap.release()
+        return samples, frames
+
+    def detect_frame_boxes(self, samples, frames):
+        """对已解码的采样帧运行YOLO，返回每帧面积最大的检测框"""
+        # 整段采样帧分批送入YOLO，置信度阈值直接交给模型过滤
+        boxes = []
+        for offset in range(0, len(frames), _YOLO_BATCH_SIZE):
+            batch = frames[offset:offset + _YOLO_BATCH_SIZE]
             try:
-                results = self.yolo_model(frame, verbose=False)
-                
-                # 找到最大的检测框
-                max_area = 0
-                best_box = None
-                
-                for r in results:
-                    if len(r.boxes) > 0:
-                        for i, box in enumerate(r.boxes.xyxy):
-                            conf = float(r.boxes.conf[i])
-                            if conf < self.confidence_threshold:
-                                continue
-                                
-                            x1, y1, x2, y2 = map(int, box[:4])
-                            area = (x2 - x1) * (y2 - y1)
-                            
-                            if area > max_area:
-                                max_area = area
-                                best_box = [x1, y1, x2, y2]
-                
-                if best_box is not None:
-                    boxes.append(best_box)
-                    
+                results = self.yolo_model(batch, verbose=False, conf=self.confidence_threshold)
             except Exception as e:
-                print(f"⚠️ 检测时间 {current_time:.2f}s 时出错: {e}")
+                print(f"⚠️ 检测时间 {samples[offset][0]:.2f}s 起的 {len(batch)} 帧时出错: {e}")
+                continue
             
-            current_time += sample_interval
+            for r in results:
+                best_box = _largest_box(r.boxes.xyxy.cpu().numpy(), r.boxes.conf.cpu().numpy(), self.confidence_threshold)
+                if best_box is not None:
+                    boxes.append(best_box)
         
-        cap.release()
         return boxes
 
     def cluster_boxes(self, boxes, eps=20, min_samples=3):
@@ -146,8 +268,7 @@ class SegmentedYOLOProcessor:
         centers = np.array([[(box[0] + box[2]) / 2, (box[1] + box[3]) / 2] for box in boxes])
         
         # 聚类
-        db = DBSCAN(eps=eps, min_samples=min_samples).fit(centers)
-        labels = db.labels_
+        labels = _radius_cluster_labels(centers, eps, min_samples)
         
         # 找到最大的聚类
         valid_indices = [i for i, label in enumerate(labels) if label != -1]
@@ -183,40 +304,28 @@ class SegmentedYOLOProcessor:
         if not crop_regions:
             return []
         
-        smoothed = []
         width, height = video_info['width'], video_info['height']
-        
-        for i, region in enumerate(crop_regions):
-            if region is None:
-                # 使用前一个区域或默认区域
-                if smoothed:
-                    smoothed.append(smoothed[-1])
-                else:
-                    smoothed.append([0, 0, width, height])
-                continue
-            
-            x1, y1, x2, y2 = region
-            
-            # 边界检查
-            x1 = max(0, min(x1, width - 1))
-            x2 = max(x1 + 1, min(x2, width))
-            y1 = max(0, min(y1, height - 1))
-            y2 = max(y1 + 1, min(y2, height))
-            
-            if smoothed:
-                # 与前一个区域进行平滑
-                prev_x1, prev_y1, prev_x2, prev_y2 = smoothed[-1]
-                
-                # 使用加权平均进行平滑
-                alpha = 0.7  # 当前帧权重
-                x1 = int(alpha * x1 + (1 - alpha) * prev_x1)
-                y1 = int(alpha * y1 + (1 - alpha) * prev_y1)
-                x2 = int(alpha * x2 + (1 - alpha) * prev_x2)
-                y2 = int(alpha * y2 + (1 - alpha) * prev_y2)
-            
-            smoothed.append([x1, y1, x2, y2])
-        
-        return smoothed
+        valid = np.array([region is not None for region in crop_regions])
+        regions = np.array([region for region in crop_regions if region is not None], dtype=np.int64).reshape(-1, 4)
+        
+        # 边界检查（整列一次完成）
+        x1 = np.clip(regions[:, 0], 0, width - 1)
+        x2 = np.maximum(x1 + 1, np.minimum(regions[:, 2], width))
+        y1 = np.clip(regions[:, 1], 0, height - 1)
+        y2 = np.maximum(y1 + 1, np.minimum(regions[:, 3], height))
+        seq = np.stack([x1, y1, x2, y2], axis=1).astype(np.float64)
+        
+        # 开头没有区域的段使用默认全画面，并作为后续平滑的起点
+        if not valid[0]:
+            seq = np.vstack([[0, 0, width, height], seq])
+        
+        # 指数加权平滑：y[k] = alpha * x[k] + (1 - alpha) * y[k-1]，首个区域保持不变
+        alpha = 0.7  # 当前帧权重
+        seq = lfilter([alpha], [1.0, alpha - 1.0], seq, axis=0, zi=(1 - alpha) * seq[:1])[0]
+        
+        # 没有区域的段沿用前一个平滑结果
+        index = np.cumsum(valid) - (1 if valid[0] else 0)
+        return seq.astype(np.int64)[index].tolist()
 
     def extract_audio(self, input_video, output_audio):
         """使用 ffmpeg 提取视频中的音频"""
@@ -291,24 +400,52 @@ class SegmentedYOLOProcessor:
         print("🔍 第一阶段：检测每段的最佳裁剪区域...")
         crop_regions = []
         
-        for i in range(num_segments):
-            start_time = i * self.segment_length
-            end_time = min((i + 1) * self.segment_length, duration)
-            
-            print(f"  段 {i+1}/{num_segments}: {start_time:.1f}s - {end_time:.1f}s")
-            
-            # 检测这个时间段的目标框
-            boxes = self.detect_segment_boxes(input_path, start_time, end_time)
-            
-            # 计算最佳裁剪区域
-            crop_region = self.cluster_boxes(boxes) if boxes else None
-            crop_regions.append(crop_region)
-            
-            if crop_region:
-                x1, y1, x2, y2 = crop_region
-                print(f"    裁剪区域: [{x1}, {y1}, {x2}, {y2}] 尺寸: {x2-x1}x{y2-y1}")
-            else:
-                print(f"    未检测到目标，将使用默认区域")
+        def segment_bounds(index):
+            return index * self.segment_length, min((index + 1) * self.segment_length, duration)
+        
+        # 解码在线程池中提前进行（OpenCV 解码释放 GIL），YOLO 推理留在当前线程顺序执行；
+        # 预取窗口有限，避免长视频把所有段的采样帧同时留在内存里
+        workers = min(_DECODE_WORKERS, os.cpu_count() or 1)
+        pending = deque()
+        next_index = 0
+        
+        # 每个解码线程只打开一次视频，在其负责的所有段之间复用
+        local = threading.local()
+        opened_caps = []
+        
+        def sample_segment(start_time, end_time):
+            cap = getattr(local, 'cap', None)
+            if cap is None:
+                cap = local.cap = cv2.VideoCapture(input_path)
+                opened_caps.append(cap)
+            return self.sample_segment_frames(input_path, start_time, end_time, cap=cap)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for i in range(num_segments):
+                    while next_index < num_segments and len(pending) < workers * 2:
+                        pending.append(executor.submit(sample_segment, *segment_bounds(next_index)))
+                        next_index += 1
+                    
+                    start_time, end_time = segment_bounds(i)
+                    print(f"  段 {i+1}/{num_segments}: {start_time:.1f}s - {end_time:.1f}s")
+                    
+                    # 检测这个时间段的目标框
+                    samples, frames = pending.popleft().result()
+                    boxes = self.detect_frame_boxes(samples, frames)
+                    
+                    # 计算最佳裁剪区域
+                    crop_region = self.cluster_boxes(boxes) if boxes else None
+                    crop_regions.append(crop_region)
+                    
+                    if crop_region:
+                        x1, y1, x2, y2 = crop_region
+                        print(f"    裁剪区域: [{x1}, {y1}, {x2}, {y2}] 尺寸: {x2-x1}x{y2-y1}")
+                    else:
+                        print(f"    未检测到目标，将使用默认区域")
+        finally:
+            for cap in opened_caps:
+                cap.release()
         
         # 平滑裁剪区域
         print("🔧 平滑裁剪区域...")
@@ -317,6 +454,19 @@ class SegmentedYOLOProcessor:
         # 第二阶段：按分段裁剪视频
         print("✂️ 第二阶段：分段裁剪视频...")
         
+        # 所有段都是全画面时无需裁剪，直接流拷贝
+        full_frame = [0, 0, video_info['width'], video_info['height']]
+        if all(list(region) == full_frame for region in crop_regions):
+            if self._remux_copy(input_path, output_path):
+                print("✅ 未需要裁剪，已直接流拷贝")
+                return True
+        
+        # 优先用单个 ffmpeg 滤镜图完成裁剪、编码和音频复用
+        if self._crop_with_ffmpeg(input_path, output_path, crop_regions, video_info):
+            print("✅ 分段YOLO处理完成")
+            return True
+        print("⚠️ ffmpeg 分段裁剪失败，回退到逐帧裁剪")
+        
         # 创建临时文件
         temp_video_path = output_path.replace('.mp4', '_temp_nosound.mp4')
         
@@ -356,6 +506,122 @@ class SegmentedYOLOProcessor:
         
         return success
 
+    def build_crop_filter(self, crop_regions, video_info):
+        """
+        生成分段裁剪的 ffmpeg 滤镜图
+
+        相邻且裁剪区域相同的段合并为一个 trim 分支；各分支裁剪后统一缩放到
+        第一个有效区域的尺寸（取偶数，满足 yuv420p），最后 concat 成一路输出。
+
+        Returns:
+            (filter_graph, output_label)；没有有效区域时返回 None
+        """
+        valid_region = next((r for r in crop_regions if r is not None), None)
+        if valid_region is None:
+            return None
+        
+        width, height = video_info['width'], video_info['height']
+        out_w = max(2, (valid_region[2] - valid_region[0]) // 2 * 2)
+        out_h = max(2, (valid_region[3] - valid_region[1]) // 2 * 2)
+        
+        # 合并相同区域的连续段：[(起始段号, 区域)]
+        runs = []
+        for i, region in enumerate(crop_regions):
+            region = list(region) if region is not None else [0, 0, width, height]
+            if not runs or runs[-1][1] != region:
+                runs.append((i, region))
+        
+        n = len(runs)
+        if n == 1:
+            branch_inputs = ["[0:v]"]
+            chains = []
+        else:
+            branch_inputs = [f"[s{k}]" for k in range(n)]
+            chains = ["[0:v]split=%d%s" % (n, "".join(branch_inputs))]
+        
+        for k, (seg_start, region) in enumerate(runs):
+            x1, y1, x2, y2 = region
+            x1 = max(0, min(x1, width - 1))
+            x2 = max(x1 + 1, min(x2, width))
+            y1 = max(0, min(y1, height - 1))
+            y2 = max(y1 + 1, min(y2, height))
+            
+            trim = [f"start={seg_start * self.segment_length:.3f}"]
+            if k + 1 < n:
+                trim.append(f"end={runs[k + 1][0] * self.segment_length:.3f}")
+            chains.append(
+                f"{branch_inputs[k]}trim={':'.join(trim)},setpts=PTS-STARTPTS,"
+                f"crop={x2 - x1}:{y2 - y1}:{x1}:{y1},scale={out_w}:{out_h},setsar=1[v{k}]"
+            )
+        
+        if n == 1:
+            return ";".join(chains), "[v0]"
+        chains.append("".join(f"[v{k}]" for k in range(n)) + f"concat=n={n}:v=1:a=0[vout]")
+        return ";".join(chains), "[vout]"
+
+    def _remux_copy(self, input_path, output_path):
+        """不重新编码，直接把视频和音频流拷贝到输出文件"""
+        cmd = [
+            'ffmpeg', '-y',
+            '-loglevel', 'error', '-nostdin',
+            '-i', input_path,
+            '-map', '0:v:0',
+            '-map', '0:a?',
+            '-c', 'copy',
+            output_path
+        ]
+        try:
+            subprocess.run(cmd, check=True, capture_output=True)
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            print(f"流拷贝失败: {e}")
+            return False
+
+    def _crop_with_ffmpeg(self, input_path, output_path, crop_regions, video_info):
+        """用 ffmpeg 滤镜图分段裁剪并编码，音频直接复用到同一输出"""
+        built = self.build_crop_filter(crop_regions, video_info)
+        if built is None:
+            print("❌ 没有有效的裁剪区域")
+            return False
+        filter_graph, out_label = built
+        
+        # 长视频的滤镜图可能超过命令行长度限制，写入脚本文件
+        fd, script_path = tempfile.mkstemp(suffix='.txt', prefix='crop_filter_')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(filter_graph)
+            for encoder, encoder_args in _video_encoder_candidates():
+                hw = encoder != _CPU_VIDEO_ENCODER[0]
+                cmd = [
+                    'ffmpeg', '-y',
+                    '-loglevel', 'error', '-nostdin',
+                    *(['-hwaccel', 'auto'] if hw else []),
+                    '-i', input_path,
+                    '-filter_complex_script', script_path,
+                    '-map', out_label,
+                    '-map', '0:a?',
+                    '-c:v', encoder,
+                    *encoder_args,
+                    '-pix_fmt', 'yuv420p',
+                    '-c:a', 'aac',
+                    output_path
+                ]
+                try:
+                    subprocess.run(cmd, check=True, capture_output=True)
+                    return True
+                except subprocess.CalledProcessError as e:
+                    err = (e.stderr or b"").decode('utf-8', errors='ignore')[:300]
+                    print(f"ffmpeg 分段裁剪失败 ({encoder}): {err}")
+            return False
+        except FileNotFoundError:
+            print("❌ ffmpeg不可用，无法分段裁剪")
+            return False
+        finally:
+            try:
+                os.remove(script_path)
+            except OSError:
+                pass
+
     def _crop_video_segments(self, input_path, output_path, crop_regions, video_info):
         """裁剪视频段"""
         try:
@@ -381,32 +647,41 @@ class SegmentedYOLOProcessor:
             fourcc = cv2.VideoWriter_fourcc(*'mp4v')
             out = cv2.VideoWriter(output_path, fourcc, fps, (crop_w, crop_h))
             
-            current_segment = 0
             frame_count = 0
             total_frames = video_info['total_frames']
+            if fps <= 0:
+                raise ValueError(f"无效的帧率: {fps}")
+            
+            # 预先计算每帧所属段（与逐帧 int(时间 / 段长) 的结果一致）
+            frame_segments = np.minimum(
+                (np.arange(max(total_frames, 0)) / fps / self.segment_length).astype(np.int64),
+                len(crop_regions) - 1
+            )
+            full_frame = [0, 0, video_info['width'], video_info['height']]
+            regions = np.array([r if r is not None else full_frame for r in crop_regions], dtype=np.int64)
+            crop_table = None
             
             while True:
                 ret, frame = cap.read()
                 if not ret:
                     break
                 
-                # 计算当前帧属于哪个段
-                current_time = frame_count / fps
-                segment_index = min(int(current_time / self.segment_length), len(crop_regions) - 1)
-                
-                # 获取当前段的裁剪区域
-                crop_region = crop_regions[segment_index]
-                if crop_region is None:
-                    crop_region = [0, 0, video_info['width'], video_info['height']]
+                if crop_table is None:
+                    # 按实际帧尺寸一次性完成所有段的边界检查，之后逐帧只需查表
+                    h, w = frame.shape[:2]
+                    x1_c = np.clip(regions[:, 0], 0, w - 1)
+                    x2_c = np.maximum(x1_c + 1, np.minimum(regions[:, 2], w))
+                    y1_c = np.clip(regions[:, 1], 0, h - 1)
+                    y2_c = np.maximum(y1_c + 1, np.minimum(regions[:, 3], h))
+                    segment_table = np.stack([x1_c, y1_c, x2_c, y2_c], axis=1).astype(np.int32)
+                    crop_table = segment_table[frame_segments]
                 
-                x1, y1, x2, y2 = crop_region
-                
-                # 裁剪帧
-                h, w = frame.shape[:2]
-                x1_c = max(0, min(x1, w - 1))
-                x2_c = max(x1_c + 1, min(x2, w))
-                y1_c = max(0, min(y1, h - 1))
-                y2_c = max(y1_c + 1, min(y2, h))
+                if frame_count < len(crop_table):
+                    x1_c, y1_c, x2_c, y2_c = crop_table[frame_count]
+                else:
+                    # 元数据帧数偏少（或未知）时逐帧计算所属段
+                    segment_index = min(int(frame_count / fps / self.segment_length), len(crop_regions) - 1)
+                    x1_c, y1_c, x2_c, y2_c = segment_table[segment_index]
                 
                 cropped = frame[y1_c:y2_c, x1_c:x2_c]
                 
@@ -535,15 +810,20 @@ class VideoEmotionInference:
             sample_frames = []
             current_time = start_time
             
+            skip = int(fps * 0.5)  # 每0.5秒采样一帧
+            
             while current_time < end_time and len(sample_frames) < 5:
                 ret, frame = cap.read()
                 if not ret:
                     break
                 sample_frames.append(frame)
-                # 跳过一些帧
-                for _ in range(int(fps * 0.5)):  # 每0.5秒采样一帧
-                    cap.read()
-                    current_time += 0.5
+                current_time += 0.5 * skip
+                if current_time >= end_time or len(sample_frames) >= 5:
+                    break
+                # 跳过的帧只 grab，不解码和转换颜色
+                for _ in range(skip):
+                    if not cap.grab():
+                        break
             
             cap.release()
             
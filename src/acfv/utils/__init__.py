@@ -6,14 +6,15 @@ import unicodedata
 
 __all__ = ["safe_slug", "extract_time_from_clip_filename"]
 
+# Any run of characters outside [A-Za-z0-9.-] (underscores included) becomes a
+# single "_"; equivalent to the old illegal-char/whitespace/non-ASCII/collapse chain.
+_SLUG_RUN_RE = re.compile(r"[^A-Za-z0-9.-]+")
+
 
 def safe_slug(text: str, max_length: int = 80) -> str:
     """Return a filesystem-safe slug with an optional length cap."""
     normalized = unicodedata.normalize("NFKC", text or "")
-    cleaned = re.sub(r'[\\/:*?"<>|]+', "_", normalized)
-    cleaned = re.sub(r"\s+", "_", cleaned)
-    cleaned = re.sub(r"[^A-Za-z0-9._-]+", "_", cleaned)
-    cleaned = re.sub(r"_+", "_", cleaned).strip("_-")
+    cleaned = _SLUG_RUN_RE.sub("_", normalized).strip("_-")
     if not cleaned:
         cleaned = "video"
     if len(cleaned) <= max_length:
@@ -143,3 +143,31 @@ def test_semantic_merge_trims_long_semantic_window_to_highlight_core():
         assert duration < 80.0, "semantic window should be trimmed to the highlight core instead of staying near fixed target"
         assert 70000 <= first["start_ms"] <= 90000
         assert 112000 <= first["end_ms"] <= 126000
+
+
+def test_block_similarity_compares_against_block_centroid():
+    from acfv.modular.plugins.semantic_merge import _BlockSimilarity
+
+    sim = _BlockSimilarity(["alpha beta", "alpha beta", "gamma delta", "alpha gamma"])
+    sim.reset(0)
+    assert sim.similarity(1) > 0.99
+    sim.add(1)
+    assert sim.similarity(2) == 0.0
+    assert 0.0 < sim.similarity(3) < 1.0
+    sim.reset(2)
+    assert sim.similarity(0) == 0.0
+
+
+def test_semantic_merge_reuses_tfidf_cache(tmp_path):
+    from acfv.modular.plugins import semantic_merge
+
+    cache_path = tmp_path / "tfidf.pkl"
+    semantic_merge._tfidf_cache.clear()
+    with _with_config({"TFIDF_CACHE_PATH": str(cache_path)}):
+        first = semantic_merge._tfidf_transform(["alpha beta", "gamma delta"])
+        assert cache_path.exists()
+        semantic_merge._tfidf_cache.clear()
+        second = semantic_merge._tfidf_transform(["alpha gamma", "unseen words"])
+    semantic_merge._tfidf_cache.clear()
+    assert first.shape[1] == second.shape[1]
+    assert second[1].nnz == 0
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from acfv.ragstack.index import faiss_index
+
+
+def test_bruteforce_search_returns_sorted_top_k(tmp_path, monkeypatch):
+    monkeypatch.setattr(faiss_index, "FAISS_AVAILABLE", False)
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((50, 16)).astype(np.float32)
+    clip_ids = list(range(100, 150))
+    index_path = tmp_path / "index.faiss"
+    id_map_path = tmp_path / "ids.npy"
+    faiss_index.build_index(embeddings, clip_ids, index_path, id_map_path)
+
+    query = embeddings[7:8] + 0.01
+    ids, scores = faiss_index.search(query, 5, index_path, id_map_path)
+
+    assert len(ids) == 5
+    assert ids[0] == 107
+    assert scores == sorted(scores, reverse=True)
+    normed = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    q = query / np.linalg.norm(query)
+    expected = [clip_ids[i] for i in np.argsort(-(q @ normed.T)[0])[:5]]
+    assert ids == expected
+
+
+def test_bruteforce_search_top_k_larger_than_collection(tmp_path, monkeypatch):
+    monkeypatch.setattr(faiss_index, "FAISS_AVAILABLE", False)
+    embeddings = np.eye(3, dtype=np.float32)
+    index_path = tmp_path / "index.faiss"
+    id_map_path = tmp_path / "ids.npy"
+    faiss_index.build_index(embeddings, [1, 2, 3], index_path, id_map_path)
+
+    ids, scores = faiss_index.search(np.array([[0.0, 1.0, 0.0]]), 10, index_path, id_map_path)
+
+    assert ids[0] == 2
+    assert sorted(ids) == [1, 2, 3]
+    assert len(scores) == 3
+
+
+def test_search_rejects_index_built_with_other_embedding_scheme(tmp_path, monkeypatch):
+    monkeypatch.setattr(faiss_index, "FAISS_AVAILABLE", False)
+    embeddings = np.eye(3, dtype=np.float32)
+    index_path = tmp_path / "index.faiss"
+    id_map_path = tmp_path / "ids.npy"
+    query = np.array([[0.0, 1.0, 0.0]])
+    faiss_index.build_index(embeddings, [1, 2, 3], index_path, id_map_path, embedding_scheme="hash-v1")
+
+    ids, _ = faiss_index.search(query, 1, index_path, id_map_path, embedding_scheme="hash-v1")
+    assert ids == [2]
+    with pytest.raises(ValueError, match="rebuild"):
+        faiss_index.search(query, 1, index_path, id_map_path, embedding_scheme="hash-v2")
+
+    # Rebuilding without a scheme drops the stale marker; such indexes are rejected too.
+    faiss_index.build_index(embeddings, [1, 2, 3], index_path, id_map_path)
+    assert faiss_index.read_embedding_scheme(id_map_path) is None
+    with pytest.raises(ValueError):
+        faiss_index.search(query, 1, index_path, id_map_path, embedding_scheme="hash-v1")
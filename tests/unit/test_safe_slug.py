@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from acfv.utils import safe_slug
+
+
+def test_safe_slug_collapses_illegal_whitespace_and_underscore_runs():
+    assert safe_slug('a  b\\/:*?"<>|c') == "a_b_c"
+    assert safe_slug("__ foo _ bar __") == "foo_bar"
+    assert safe_slug("v1.2-final 中文") == "v1.2-final"
+
+
+def test_safe_slug_empty_and_long_inputs():
+    assert safe_slug("") == "video"
+    assert safe_slug("中文") == "video"
+    slug = safe_slug("x" * 200, max_length=20)
+    assert len(slug) <= 20
+    assert slug.startswith("x")
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import json
 
+import pytest
+
 
 class _DummyCfg:
     def get(self, _key, default=None):
@@ -35,3 +37,89 @@ def test_generate_semantic_subtitles_for_clips_srt(tmp_path):
     subtitle_path = tmp_path / "clip_001_00h00m00s_0-9000.srt"
     assert subtitle_path.exists()
     assert subtitle_path.read_text(encoding="utf-8").strip()
+
+
+def test_semantic_merge_uses_shared_vectorizer():
+    from acfv.steps.subtitle_generator.impl import _SHORT_TEXT_LIMIT, _fit_vectorizer, _semantic_merge
+
+    texts = ["the boss fight starts now", "the boss fight is over"] + [
+        f"unrelated chat number {i}" for i in range(_SHORT_TEXT_LIMIT)
+    ]
+    vectorizer = _fit_vectorizer(texts)
+    assert vectorizer is not None
+    vocabulary = dict(vectorizer.vocabulary_)
+    sentences = [{"start": i * 10.0, "end": i * 10.0 + 2.0, "text": t} for i, t in enumerate(texts)]
+    sentences[1]["start"], sentences[1]["end"] = 2.0, 4.0
+
+    merged = _semantic_merge(sentences, sim_threshold=0.3, max_gap=1.0, min_chars=1, vectorizer=vectorizer)
+
+    assert merged[0]["text"] == "the boss fight starts now the boss fight is over"
+    assert len(merged) == len(texts) - 1
+    assert vectorizer.vocabulary_ == vocabulary
+
+
+def test_semantic_merge_short_input_matches_sklearn_tfidf():
+    from acfv.steps.subtitle_generator.impl import _adj_sim_short, _adj_sim_tfidf, _semantic_merge
+
+    texts = ["boss fight starts", "boss fight ends", "unrelated chat", "chat spam again"]
+    expected = _adj_sim_tfidf(texts)
+    if expected is not None:
+        assert _adj_sim_short(texts) == pytest.approx(list(expected))
+    assert _adj_sim_short(["abc", "abc", "xyz"]) == pytest.approx([1.0, 0.0])
+    sentences = [
+        {"start": 0.0, "end": 2.0, "text": "boss fight starts"},
+        {"start": 2.0, "end": 4.0, "text": "boss fight ends"},
+        {"start": 4.0, "end": 6.0, "text": "unrelated chat"},
+    ]
+
+    merged = _semantic_merge(sentences, sim_threshold=0.4, max_gap=1.0, min_chars=1)
+
+    assert [m["text"] for m in merged] == ["boss fight starts boss fight ends", "unrelated chat"]
+
+
+def test_generate_semantic_subtitles_for_multiple_clips(tmp_path):
+    from acfv.steps.subtitle_generator.impl import generate_semantic_subtitles_for_clips
+
+    transcription = {
+        "segments": [
+            {"start": 0.0, "end": 5.0, "text": "hello world."},
+            {"start": 5.0, "end": 9.0, "text": "next sentence."},
+            {"start": 9.0, "end": 15.0, "text": "another clip starts here."},
+        ]
+    }
+    transcription_path = tmp_path / "transcription.json"
+    transcription_path.write_text(json.dumps(transcription), encoding="utf-8")
+
+    clip_paths = []
+    for name in ("clip_001_00h00m00s_0-9000.mp4", "clip_002_00h00m09s_9000-15000.mp4"):
+        clip_path = tmp_path / name
+        clip_path.write_text("", encoding="utf-8")
+        clip_paths.append(str(clip_path))
+
+    written = generate_semantic_subtitles_for_clips(
+        output_clips_dir=str(tmp_path),
+        transcription_file=str(transcription_path),
+        cfg_manager=_DummyCfg(),
+        clip_paths=clip_paths,
+        fmt="srt",
+    )
+
+    assert written == 2
+    second = (tmp_path / "clip_002_00h00m09s_9000-15000.srt").read_text(encoding="utf-8")
+    assert "another clip starts here." in second
+    assert "00:00:00,000 --> 00:00:06,000" in second
+
+
+def test_read_transcription_accepts_nan_scores(tmp_path):
+    from acfv.steps.subtitle_generator.impl import _read_transcription
+
+    path = tmp_path / "transcription.json"
+    path.write_text(
+        json.dumps([{"start": 0.0, "end": 1.0, "text": "hi", "avg_logprob": float("nan")}]),
+        encoding="utf-8",
+    )
+
+    segments = _read_transcription(str(path))
+
+    assert len(segments) == 1
+    assert segments[0]["text"] == "hi"
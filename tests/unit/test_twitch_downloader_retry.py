@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import io
+import types
+
+import pytest
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+        self.slept += seconds
+
+
+def _install_fake_cli(monkeypatch, tmp_path, impl, return_codes, attempt_seconds):
+    clock = _FakeClock()
+    monkeypatch.setattr(impl, "time", types.SimpleNamespace(monotonic=clock.monotonic, sleep=clock.sleep))
+    monkeypatch.setattr(impl.random, "random", lambda: 0.5)
+
+    calls = []
+
+    class _FakePopen:
+        def __init__(self, command, **kwargs):
+            calls.append(command)
+            self._code = return_codes[len(calls) - 1]
+            self.stdin = io.StringIO()
+            self.stdout = io.StringIO("")
+
+        def wait(self):
+            # 每次下载尝试都运行很久才结束
+            clock.now += attempt_seconds
+            return self._code
+
+    monkeypatch.setattr(impl.subprocess, "Popen", _FakePopen)
+
+    cli = tmp_path / "TwitchDownloaderCLI"
+    cli.write_text("", encoding="utf-8")
+    downloader = impl.TwitchDownloader(config_manager=None)
+    downloader.cli_path = str(cli)
+    return downloader, clock, calls
+
+
+def test_download_retries_after_long_failing_attempts(monkeypatch, tmp_path):
+    pytest.importorskip("PyQt5.QtCore")
+    from acfv.steps.twitch_downloader import impl
+
+    downloader, clock, calls = _install_fake_cli(
+        monkeypatch, tmp_path, impl, return_codes=[1, 1, 0], attempt_seconds=600.0
+    )
+
+    ok = downloader._download_with_retry(
+        "videodownload", "123", str(tmp_path / "out.mp4"), "下载视频", max_retry_seconds=120.0
+    )
+
+    assert ok is True
+    assert len(calls) == 3
+    assert clock.slept == pytest.approx(1.0 + 2.0)
+
+
+def test_download_backoff_sleep_is_capped_by_budget(monkeypatch, tmp_path):
+    pytest.importorskip("PyQt5.QtCore")
+    from acfv.steps.twitch_downloader import impl
+
+    downloader, clock, calls = _install_fake_cli(
+        monkeypatch, tmp_path, impl, return_codes=[1, 1, 1], attempt_seconds=600.0
+    )
+
+    ok = downloader._download_with_retry(
+        "videodownload", "123", str(tmp_path / "out.mp4"), "下载视频", max_retry_seconds=1.5
+    )
+
+    assert ok is False
+    assert len(calls) == 3
+    assert clock.slept == pytest.approx(1.5)